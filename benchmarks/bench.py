@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark for todoist-llm-assistant.
+
+Starts local stand-ins for Todoist and OpenAI (see fake_servers.py), points a fresh copy of
+the assistant at them through its config file, and drives the real code paths:
+
+  filter      full sync into the local task store, then get_seven_most_recent_tasks()
+              and the --update-all filter
+  generate    generate_suggestions() for every task, one after another
+  update-all  main() in --update-all mode, end to end, including batched write-back
+  batch       main() in --update-all --batch --batch-no-wait mode, a second --batch-no-wait
+              run while the batch is still running, then a run with a different --temperature
+              that resumes the batch, applies its results and submits a task added meanwhile
+
+Example:
+  python benchmarks/bench.py --scenario update-all --tasks 10,1000 --concurrency 16 \\
+      --openai-latency lognormal:0.8,0.4 --openai-429-rate 0.05
+"""
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+
+# Progress bars would swamp the report
+os.environ.setdefault("TQDM_DISABLE", "1")
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from fake_servers import FakeOpenAI, FakeTodoist  # noqa: E402
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "todoist-llm-assistant.py")
+
+CONFIG_TEMPLATE = """[todoist]
+api_key = bench-todoist-key
+sync_url = {todoist_url}/sync/v9/sync
+store_path = {workdir}/store.json
+
+[openai]
+api_key = bench-openai-key
+base_url = {openai_url}/v1
+preferred_model = {model}
+max_retries = 8
+
+[cache]
+path = {workdir}/cache.sqlite3
+"""
+
+_loaded = 0
+
+
+def load_assistant(workdir, todoist, openai, model):
+    """Import a fresh copy of the assistant configured against the fake servers."""
+    global _loaded
+    config_file = os.path.join(workdir, "config.ini")
+    with open(config_file, "w") as f:
+        f.write(CONFIG_TEMPLATE.format(todoist_url=todoist.url, openai_url=openai.url, workdir=workdir, model=model))
+    os.chdir(workdir)
+
+    # The Todoist SDK has no base URL setting, so its REST calls are redirected here
+    from todoist_api_python import endpoints
+    endpoints.REST_API = f"{todoist.url}/rest/v2/"
+
+    _loaded += 1
+    spec = importlib.util.spec_from_file_location(f"todoist_llm_assistant_bench_{_loaded}", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    module.configure(config_file)
+    return module
+
+
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def run_filter(assistant, todoist, args):
+    store = assistant.TaskStore(None)
+    client = assistant.TodoistSyncClient("bench-todoist-key")
+    _, sync_seconds = timed(store.sync, client)
+    project_index = assistant.ProjectIndex(store.get_projects())
+
+    page_times = []
+    for _ in range(args.repeat):
+        _, seconds = timed(assistant.get_seven_most_recent_tasks, store, 0, True, True, project_index)
+        page_times.append(seconds)
+    update_all_times = []
+    for _ in range(args.repeat):
+        _, seconds = timed(assistant.filter_tasks, store.get_tasks(), project_index, True, False, True, True)
+        update_all_times.append(seconds)
+    _, delta_seconds = timed(store.sync, client)
+
+    return {
+        "full_sync_seconds": sync_seconds,
+        "delta_sync_seconds": delta_seconds,
+        "next_page_filter": assistant.RunMetrics.percentiles(page_times),
+        "update_all_filter": assistant.RunMetrics.percentiles(update_all_times),
+    }
+
+
+def run_generate(assistant, todoist, args):
+    store = assistant.TaskStore(None)
+    store.sync(assistant.TodoistSyncClient("bench-todoist-key"))
+    tasks = store.get_tasks()
+    start = time.perf_counter()
+    for task in tasks:
+        assistant.generate_suggestions(None, task, args.model, args.tokens, 0.7, reasoning_effort="low", quiet=True)
+    elapsed = time.perf_counter() - start
+    return {"elapsed_seconds": elapsed, "tasks": len(tasks), "throughput_tasks_per_second": len(tasks) / elapsed if elapsed else None}
+
+
+def run_update_all(assistant, todoist, args):
+    start = time.perf_counter()
+    with contextlib.suppress(SystemExit):
+        assistant.main(
+            interactive=False, update_all=True, due_today=False, model_name=args.model,
+            token_budget=args.tokens, temperature=0.7, reasoning_effort="low",
+            concurrency=args.concurrency, use_cache=not args.no_cache, config_file="config.ini",
+        )
+    elapsed = time.perf_counter() - start
+    updated = sum(1 for task in todoist.tasks.values() if "SUGGESTION" in task["description"])
+    return {"elapsed_seconds": elapsed, "tasks_updated": updated, "throughput_tasks_per_second": updated / elapsed if elapsed else None}
+
+
+def run_batch(assistant, todoist, args):
+    options = dict(
+        interactive=False, update_all=True, due_today=False, model_name=args.model, token_budget=args.tokens,
+        reasoning_effort="low", use_cache=not args.no_cache, batch=True, batch_poll_interval=0.05, config_file="config.ini",
+    )
+
+    def close_resources():
+        for resource in (assistant.suggestion_cache, assistant.similarity_index):
+            if resource is not None:
+                resource.close()
+
+    original_ids = list(todoist.tasks)
+    start = time.perf_counter()
+    with contextlib.suppress(SystemExit):
+        assistant.main(temperature=0.7, batch_wait=False, **options)
+    submitted = os.path.exists(assistant.settings.batch_state_path)
+    close_resources()
+
+    # Checks the unfinished batch once and exits instead of waiting for it
+    with contextlib.suppress(SystemExit):
+        assistant.main(temperature=0.7, batch_wait=False, **options)
+    returned_while_running = os.path.exists(assistant.settings.batch_state_path) and not any(
+        "SUGGESTION" in task["description"] for task in todoist.tasks.values())
+    close_resources()
+
+    new_task_id = todoist.add_task("Plan garden layout")
+    with contextlib.suppress(SystemExit):
+        assistant.main(temperature=0.2, batch_wait=True, **options)
+    elapsed = time.perf_counter() - start
+
+    updated = sum(1 for task in todoist.tasks.values() if "SUGGESTION" in task["description"])
+    # Results belong under the settings the batch was submitted with, not the resuming run's
+    cached = None
+    if assistant.suggestion_cache is not None:
+        make_key = assistant.SuggestionCache.make_key
+        cached = sum(1 for task_id in original_ids
+                     if assistant.suggestion_cache.get(make_key(todoist.tasks[task_id]["content"], args.model, 0.7, "low", args.tokens)) is not None)
+    return {
+        "elapsed_seconds": elapsed, "tasks_updated": updated, "submitted_without_waiting": submitted,
+        "returned_while_running": returned_while_running,
+        "new_task_after_resume": "SUGGESTION" in todoist.tasks[new_task_id]["description"],
+        "cached_under_batch_settings": cached, "throughput_tasks_per_second": updated / elapsed if elapsed else None,
+    }
+
+
+SCENARIOS = {"filter": run_filter, "generate": run_generate, "update-all": run_update_all, "batch": run_batch}
+
+
+def run(scenario, num_tasks, args):
+    todoist = FakeTodoist(num_tasks, latency=args.todoist_latency, error_rate=args.todoist_429_rate, retry_after=args.retry_after, seed=args.seed).start()
+    openai = FakeOpenAI(latency=args.openai_latency, error_rate=args.openai_429_rate, retry_after=args.retry_after, seed=args.seed,
+                        batch_delay=args.batch_delay).start()
+    cwd = os.getcwd()
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            assistant = load_assistant(workdir, todoist, openai, args.model)
+            log = io.StringIO()
+            with contextlib.redirect_stdout(log):
+                result = SCENARIOS[scenario](assistant, todoist, args)
+                snapshot = assistant.metrics.snapshot()
+            if assistant.suggestion_cache is not None:
+                assistant.suggestion_cache.close()
+            if assistant.similarity_index is not None:
+                assistant.similarity_index.close()
+    finally:
+        os.chdir(cwd)
+        todoist.stop()
+        openai.stop()
+
+    return {
+        "scenario": scenario,
+        "account_size": num_tasks,
+        **result,
+        "llm_latency": snapshot["llm_latency"],
+        "write_latency": snapshot["write_latency"],
+        "phase_seconds": snapshot["phase_seconds"],
+        "errors": snapshot["errors"],
+        "todoist_requests": dict(todoist.requests),
+        "openai_requests": dict(openai.requests),
+    }
+
+
+def print_report(result):
+    print(f"\n== {result['scenario']} | {result['account_size']} tasks ==")
+    for key in ("elapsed_seconds", "full_sync_seconds", "delta_sync_seconds"):
+        if key in result:
+            print(f"  {key:<28} {result[key]:.3f}")
+    if result.get("throughput_tasks_per_second") is not None:
+        print(f"  {'throughput (tasks/s)':<28} {result['throughput_tasks_per_second']:.1f}")
+    for key in ("next_page_filter", "update_all_filter"):
+        if key in result:
+            stats = result[key]
+            print(f"  {key + ' (ms)':<28} p50={stats['p50'] * 1000:.2f} p95={stats['p95'] * 1000:.2f} p99={stats['p99'] * 1000:.2f}")
+    for model, stats in result["llm_latency"].items():
+        print(f"  {'llm latency ' + model + ' (s)':<28} p50={stats['p50']:.3f} p95={stats['p95']:.3f} p99={stats['p99']:.3f} n={stats['count']}")
+    if result["write_latency"]["count"]:
+        stats = result["write_latency"]
+        print(f"  {'write-back latency (s)':<28} p50={stats['p50']:.3f} p95={stats['p95']:.3f} p99={stats['p99']:.3f} n={stats['count']}")
+    for key in ("tasks_updated", "submitted_without_waiting", "returned_while_running",
+                "new_task_after_resume", "cached_under_batch_settings"):
+        if key in result:
+            print(f"  {key:<28} {result[key]}")
+    print(f"  {'errors':<28} {result['errors']}")
+    print(f"  {'todoist requests':<28} {result['todoist_requests']}")
+    print(f"  {'openai requests':<28} {result['openai_requests']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark todoist-llm-assistant against local fake Todoist and OpenAI servers")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), action="append", help="Scenario to run (repeatable, default: all)")
+    parser.add_argument("--tasks", default="10,1000", help="Comma-separated account sizes to benchmark (default: 10,1000)")
+    parser.add_argument("--model", default="gpt-4o-mini", help="Model requested from the fake OpenAI server (default: gpt-4o-mini)")
+    parser.add_argument("--tokens", type=int, default=None, help="Token budget passed to the assistant")
+    parser.add_argument("--concurrency", type=int, default=1, help="--concurrency used for the update-all scenario (default: 1)")
+    parser.add_argument("--no-cache", action="store_true", help="Run update-all without the suggestion cache")
+    parser.add_argument("--openai-latency", default="lognormal:0.05,0.5", help="OpenAI latency distribution (default: lognormal:0.05,0.5)")
+    parser.add_argument("--todoist-latency", default="const:0.01", help="Todoist latency distribution (default: const:0.01)")
+    parser.add_argument("--openai-429-rate", type=float, default=0.0, help="Fraction of OpenAI requests answered with 429")
+    parser.add_argument("--todoist-429-rate", type=float, default=0.0, help="Fraction of Todoist requests answered with 429")
+    parser.add_argument("--retry-after", type=float, default=0.05, help="Retry-After seconds sent with injected 429s (default: 0.05)")
+    parser.add_argument("--batch-delay", type=float, default=1.0, help="Seconds the fake Batch API takes to finish a batch (default: 1.0)")
+    parser.add_argument("--repeat", type=int, default=20, help="Repetitions for the filter scenario (default: 20)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for generated accounts, latencies and 429s")
+    parser.add_argument("--json-out", help="Also write all results to this JSON file")
+    args = parser.parse_args()
+
+    results = []
+    for scenario in args.scenario or sorted(SCENARIOS):
+        for num_tasks in (int(size) for size in args.tasks.split(",")):
+            result = run(scenario, num_tasks, args)
+            print_report(result)
+            results.append(result)
+
+    if args.json_out:
+        with open(args.json_out, "w") as f:
+            json.dump(results, f, indent=2)
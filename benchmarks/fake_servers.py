@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+Local stand-ins for the Todoist REST/Sync APIs and OpenAI chat completions and Batch API,
+used by the benchmark harness. Each server answers with a configurable latency distribution, can
+inject 429 responses, and counts the requests it receives.
+"""
+import json
+import math
+import random
+import re
+import threading
+import time
+import datetime
+from email.parser import BytesParser
+from collections import Counter
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import parse_qs, urlparse
+
+
+class LatencyModel:
+    """
+    Response delay in seconds, parsed from a spec string:
+    "const:0.05", "uniform:0.02,0.2" or "lognormal:MEDIAN,SIGMA" (e.g. "lognormal:0.8,0.5").
+    """
+
+    def __init__(self, spec, seed=0):
+        kind, _, args = spec.partition(":")
+        self.kind = kind
+        self.args = [float(value) for value in args.split(",") if value]
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        if kind not in ("const", "uniform", "lognormal"):
+            raise ValueError(f"Unknown latency distribution '{spec}'")
+
+    def sample(self):
+        with self._lock:
+            if self.kind == "const":
+                return self.args[0] if self.args else 0.0
+            if self.kind == "uniform":
+                return self._rng.uniform(self.args[0], self.args[1])
+            median, sigma = self.args
+            return self._rng.lognormvariate(math.log(median), sigma)
+
+
+class _FakeServer:
+    """Shared plumbing: a threaded HTTP server, latency, 429 injection and request counting."""
+
+    def __init__(self, latency="const:0", error_rate=0.0, retry_after=1.0, seed=0):
+        self.latency = LatencyModel(latency, seed)
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.requests = Counter()
+        self._rng = random.Random(seed + 1)
+        self._lock = threading.Lock()
+        self._server = None
+
+    def start(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                server._dispatch(self, "GET")
+
+            def do_POST(self):
+                server._dispatch(self, "POST")
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def _count(self, name):
+        with self._lock:
+            self.requests[name] += 1
+
+    def _should_throttle(self):
+        with self._lock:
+            return self._rng.random() < self.error_rate
+
+    def _dispatch(self, handler, method):
+        length = int(handler.headers.get("Content-Length") or 0)
+        body = handler.rfile.read(length) if length else b""
+        path = urlparse(handler.path).path
+        endpoint = self.endpoint_name(method, path)
+        self._count(endpoint)
+        time.sleep(self.latency.sample())
+        if self._should_throttle():
+            self._count("throttled")
+            self._send(handler, 429, {"error": "Too Many Requests"}, self.throttle_headers())
+            return
+        status, payload, headers = self.handle(method, path, body, handler.headers)
+        if callable(payload):
+            payload(handler)
+        else:
+            self._send(handler, status, payload, headers)
+
+    def _send(self, handler, status, payload, headers=None):
+        data = json.dumps(payload).encode("utf-8")
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            handler.send_header(name, value)
+        handler.end_headers()
+        handler.wfile.write(data)
+
+    def throttle_headers(self):
+        return {"Retry-After": f"{self.retry_after:g}"}
+
+    def endpoint_name(self, method, path):
+        return f"{method} {path}"
+
+    def handle(self, method, path, body, headers):
+        raise NotImplementedError
+
+
+class FakeTodoist(_FakeServer):
+    """
+    Todoist account with `num_tasks` active tasks spread over a handful of projects, served
+    through the REST v2 endpoints and the Sync v9 endpoint (incremental sync and commands).
+    """
+
+    def __init__(self, num_tasks=100, **kwargs):
+        super().__init__(**kwargs)
+        rng = random.Random(kwargs.get("seed", 0))
+        today = datetime.date.today()
+        self.projects = [{"id": "p0", "name": "Inbox", "inbox_project": True}]
+        self.projects += [{"id": f"p{i}", "name": f"Project {i}"} for i in range(1, 6)]
+        verbs = ["Call", "Email", "Renew", "Prepare", "Review", "Book", "Buy", "Plan", "Fix", "Write"]
+        objects = ["dentist", "passport", "quarterly report", "flights", "milk", "team offsite", "car", "blog post", "insurance", "budget"]
+        self.tasks = {}
+        self.versions = {}
+        self.version = 1
+        for i in range(num_tasks):
+            due = None
+            roll = rng.random()
+            if roll < 0.6:
+                date = (today + datetime.timedelta(days=rng.randint(-30, 30))).isoformat()
+                due = {"date": date, "string": "every week" if roll < 0.05 else date, "is_recurring": roll < 0.05}
+            task_id = str(1000000 + i)
+            self.tasks[task_id] = {
+                "id": task_id,
+                "content": f"{rng.choice(verbs)} {rng.choice(objects)} #{i}",
+                "description": "",
+                "project_id": rng.choice(self.projects)["id"],
+                "due": due,
+                "priority": rng.randint(1, 4),
+                "labels": [],
+                "checked": False,
+                "is_deleted": False,
+            }
+            self.versions[task_id] = self.version
+
+    def add_task(self, content):
+        """Create a task as if it had been added in the Todoist app; returns its id."""
+        with self._lock:
+            task_id = str(1000000 + len(self.tasks))
+            self.tasks[task_id] = {
+                "id": task_id, "content": content, "description": "", "project_id": "p1", "due": None,
+                "priority": 1, "labels": [], "checked": False, "is_deleted": False,
+            }
+        self._touch(task_id)
+        return task_id
+
+    def endpoint_name(self, method, path):
+        if path.startswith("/rest/v2/tasks/"):
+            return f"{method} /rest/v2/tasks/{{id}}"
+        return f"{method} {path}"
+
+    def handle(self, method, path, body, headers):
+        if path == "/sync/v9/sync":
+            return self._sync(parse_qs(body.decode("utf-8")))
+        if path == "/rest/v2/tasks" and method == "GET":
+            return 200, [self._rest_task(task) for task in self.tasks.values()], None
+        if path == "/rest/v2/projects" and method == "GET":
+            return 200, [{"id": p["id"], "name": p["name"], "is_inbox_project": bool(p.get("inbox_project"))} for p in self.projects], None
+        match = re.fullmatch(r"/rest/v2/tasks/(\w+)", path)
+        if match and method == "POST":
+            task = self.tasks.get(match.group(1))
+            if task is None:
+                return 404, {"error": "Task not found"}, None
+            task.update({key: value for key, value in json.loads(body or b"{}").items() if key in ("content", "description")})
+            self._touch(task["id"])
+            return 200, self._rest_task(task), None
+        return 404, {"error": "Not found"}, None
+
+    def _touch(self, task_id):
+        with self._lock:
+            self.version += 1
+            self.versions[task_id] = self.version
+
+    def _sync(self, form):
+        if "commands" in form:
+            status = {}
+            for command in json.loads(form["commands"][0]):
+                task = self.tasks.get(command["args"].get("id"))
+                if command["type"] != "item_update" or task is None:
+                    status[command["uuid"]] = {"error_code": 22, "error": "Item not found", "http_code": 404}
+                    continue
+                if "description" in command["args"]:
+                    task["description"] = command["args"]["description"]
+                self._touch(task["id"])
+                status[command["uuid"]] = "ok"
+            return 200, {"sync_status": status, "sync_token": str(self.version), "temp_id_mapping": {}}, None
+
+        token = form.get("sync_token", ["*"])[0]
+        full_sync = token == "*"
+        since = 0 if full_sync else int(token)
+        items = [task for task_id, task in self.tasks.items() if self.versions[task_id] > since]
+        return 200, {
+            "full_sync": full_sync,
+            "sync_token": str(self.version),
+            "items": items,
+            "projects": self.projects if full_sync else [],
+        }, None
+
+    @staticmethod
+    def _rest_task(task):
+        due = task["due"]
+        return {
+            "id": task["id"], "content": task["content"], "description": task["description"],
+            "project_id": task["project_id"], "priority": task["priority"], "labels": task["labels"],
+            "is_completed": False, "order": 1, "comment_count": 0, "creator_id": "1",
+            "created_at": "2025-01-01T00:00:00.000000Z", "url": f"https://todoist.com/showTask?id={task['id']}",
+            "due": {"date": due["date"], "string": due["string"], "is_recurring": due["is_recurring"]} if due else None,
+        }
+
+
+class FakeOpenAI(_FakeServer):
+    """
+    Chat completions endpoint returning short canned suggestions, streamed or not, plus the
+    file upload and Batch API endpoints. A batch completes `batch_delay` seconds after it is
+    created, with one canned completion per request line.
+    """
+
+    def __init__(self, completion_tokens=60, batch_delay=0.2, **kwargs):
+        super().__init__(**kwargs)
+        self.completion_tokens = completion_tokens
+        self.batch_delay = batch_delay
+        self.files = {}
+        self.batches = {}
+
+    def throttle_headers(self):
+        # The OpenAI SDK honours retry-after-ms, which keeps injected 429s cheap
+        return {"retry-after-ms": str(int(self.retry_after * 1000)), "x-ratelimit-remaining-tokens": "0"}
+
+    def endpoint_name(self, method, path):
+        if path.startswith("/v1/batches/"):
+            return f"{method} /v1/batches/{{id}}"
+        if path.startswith("/v1/files/"):
+            return f"{method} /v1/files/{{id}}/content"
+        return f"{method} {path}"
+
+    def handle(self, method, path, body, headers):
+        if path == "/v1/files" and method == "POST":
+            return self._upload(body, headers)
+        if path == "/v1/batches" and method == "POST":
+            return self._create_batch(json.loads(body))
+        match = re.fullmatch(r"/v1/batches/([\w-]+)", path)
+        if match and method == "GET":
+            return self._get_batch(match.group(1))
+        match = re.fullmatch(r"/v1/files/([\w-]+)/content", path)
+        if match and method == "GET":
+            return self._file_content(match.group(1))
+        if path != "/v1/chat/completions" or method != "POST":
+            return 404, {"error": {"message": "Not found"}}, None
+        request = json.loads(body)
+        if request.get("stream"):
+            text, usage, base = self._completion_parts(request)
+            return 200, lambda handler: self._stream(handler, base, text, usage), None
+        return 200, self._completion(request), {"x-ratelimit-remaining-tokens": "1000000", "x-ratelimit-limit-tokens": "1000000"}
+
+    def _completion_parts(self, request):
+        prompt_tokens = sum(len(message.get("content") or "") for message in request["messages"]) // 4
+        text = "Break the task into three concrete steps and block time on your calendar for the first one."
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "total_tokens": prompt_tokens + self.completion_tokens,
+            "completion_tokens_details": {"reasoning_tokens": self.completion_tokens // 2 if request["model"].startswith("o") else 0},
+        }
+        base = {"id": "chatcmpl-bench", "created": int(time.time()), "model": request["model"]}
+        return text, usage, base
+
+    def _completion(self, request):
+        text, usage, base = self._completion_parts(request)
+        return {
+            **base,
+            "object": "chat.completion",
+            "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": text}}],
+            "usage": usage,
+        }
+
+    def _upload(self, body, headers):
+        message = BytesParser().parsebytes(f"Content-Type: {headers['Content-Type']}\r\n\r\n".encode("utf-8") + body)
+        parts = {part.get_param("name", header="content-disposition"): part for part in message.get_payload()}
+        content = parts["file"].get_payload(decode=True)
+        with self._lock:
+            file_id = f"file-{len(self.files) + 1}"
+            self.files[file_id] = content
+        return 200, self._file_object(file_id, content, parts["file"].get_filename(), parts["purpose"].get_payload()), None
+
+    @staticmethod
+    def _file_object(file_id, content, filename, purpose):
+        return {"id": file_id, "object": "file", "bytes": len(content), "created_at": int(time.time()),
+                "filename": filename or "upload", "purpose": purpose, "status": "processed"}
+
+    def _create_batch(self, request):
+        with self._lock:
+            batch_id = f"batch-{len(self.batches) + 1}"
+            total = sum(1 for line in self.files[request["input_file_id"]].splitlines() if line.strip())
+            self.batches[batch_id] = {
+                "id": batch_id, "object": "batch", "endpoint": request["endpoint"],
+                "input_file_id": request["input_file_id"], "completion_window": request["completion_window"],
+                "status": "in_progress", "created_at": int(time.time()), "output_file_id": None,
+                "request_counts": {"total": total, "completed": 0, "failed": 0},
+                "_ready_at": time.monotonic() + self.batch_delay,
+            }
+        return 200, self._public(self.batches[batch_id]), None
+
+    def _get_batch(self, batch_id):
+        with self._lock:
+            batch = self.batches.get(batch_id)
+            if batch is None:
+                return 404, {"error": {"message": "Batch not found"}}, None
+            if batch["status"] == "in_progress" and time.monotonic() >= batch["_ready_at"]:
+                lines = []
+                for line in self.files[batch["input_file_id"]].splitlines():
+                    if line.strip():
+                        request = json.loads(line)
+                        lines.append(json.dumps({
+                            "id": f"batch_req_{request['custom_id']}", "custom_id": request["custom_id"], "error": None,
+                            "response": {"status_code": 200, "request_id": "req-bench", "body": self._completion(request["body"])},
+                        }))
+                output_id = f"file-{len(self.files) + 1}"
+                self.files[output_id] = "\n".join(lines).encode("utf-8")
+                batch.update(status="completed", output_file_id=output_id, completed_at=int(time.time()))
+                batch["request_counts"]["completed"] = len(lines)
+            return 200, self._public(batch), None
+
+    def _file_content(self, file_id):
+        content = self.files.get(file_id)
+        if content is None:
+            return 404, {"error": {"message": "File not found"}}, None
+
+        def send(handler):
+            handler.send_response(200)
+            handler.send_header("Content-Type", "application/octet-stream")
+            handler.send_header("Content-Length", str(len(content)))
+            handler.end_headers()
+            handler.wfile.write(content)
+        return 200, send, None
+
+    @staticmethod
+    def _public(batch):
+        return {key: value for key, value in batch.items() if not key.startswith("_")}
+
+    @staticmethod
+    def _stream(handler, base, text, usage):
+        handler.send_response(200)
+        handler.send_header("Content-Type", "text/event-stream")
+        handler.send_header("Transfer-Encoding", "chunked")
+        handler.end_headers()
+
+        def write(data):
+            event = f"data: {data}\n\n".encode("utf-8")
+            handler.wfile.write(f"{len(event):x}\r\n".encode("ascii") + event + b"\r\n")
+
+        chunk = {**base, "object": "chat.completion.chunk"}
+        for word in text.split(" "):
+            write(json.dumps({**chunk, "choices": [{"index": 0, "delta": {"content": word + " "}, "finish_reason": None}]}))
+        write(json.dumps({**chunk, "choices": [], "usage": usage}))
+        write("[DONE]")
+        handler.wfile.write(b"0\r\n\r\n")
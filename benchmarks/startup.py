@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Startup-time benchmark for todoist-llm-assistant.
+
+Times fresh interpreter runs of the bare interpreter, importing the script as a module
+(no config file needed) and `--help`. With --importtime, also lists the slowest imports
+pulled in by `--help`.
+
+Example:
+  python benchmarks/startup.py --runs 20 --importtime
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import os
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "todoist-llm-assistant.py")
+
+IMPORT_ONLY = (
+    "import importlib.util; "
+    f"spec = importlib.util.spec_from_file_location('assistant', {SCRIPT!r}); "
+    "spec.loader.exec_module(importlib.util.module_from_spec(spec))"
+)
+
+CASES = {
+    "interpreter": [sys.executable, "-c", "pass"],
+    "import": [sys.executable, "-c", IMPORT_ONLY],
+    "--help": [sys.executable, SCRIPT, "--help"],
+}
+
+
+def time_command(command, runs, cwd):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def slowest_imports(cwd, limit):
+    result = subprocess.run([sys.executable, "-X", "importtime", SCRIPT, "--help"], cwd=cwd,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        # Only top-level imports (one leading space), so cumulative times are not counted twice
+        if not name[1:].startswith(" "):
+            rows.append((int(cumulative_us), name.strip()))
+    return sorted(rows, reverse=True)[:limit]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure todoist-llm-assistant startup time")
+    parser.add_argument("--runs", type=int, default=10, help="Runs per case (default: 10)")
+    parser.add_argument("--importtime", action="store_true", help="Also list the slowest top-level imports for --help")
+    args = parser.parse_args()
+
+    # Run from an empty directory to show that no config.ini is needed
+    with tempfile.TemporaryDirectory() as cwd:
+        for name, command in CASES.items():
+            timings = time_command(command, args.runs, cwd)
+            print(f"{name:<12} median {statistics.median(timings) * 1000:7.1f} ms   min {min(timings) * 1000:7.1f} ms")
+        if args.importtime:
+            print("\nSlowest top-level imports for --help:")
+            for cumulative_us, name in slowest_imports(cwd, 10):
+                print(f"  {cumulative_us / 1000:7.1f} ms  {name}")
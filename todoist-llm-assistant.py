@@ -2,40 +2,1097 @@
 import os
 import datetime
 import configparser
-from openai import OpenAI
-from todoist_api_python.api import TodoistAPI
+import functools
+import glob
 from colorama import Fore, Style, init
 import argparse
-from tqdm import tqdm
 import sys
 import json
 import time
+import threading
+import hashlib
+import hmac
+import base64
+import heapq
+import itertools
+import math
+import sqlite3
+import re
+import random
+import uuid
+import zlib
+from array import array
+from collections import defaultdict
+from contextlib import contextmanager, redirect_stdout
+
+# openai, todoist_api_python, requests, tqdm and concurrent.futures are imported where they
+# are first needed, so --help and runs with nothing to do start quickly
 
 
-# Initialize colorama
-init()
-# Read configuration
 CONFIG_FILE = "config.ini"
-config = configparser.ConfigParser()
-try:
-    config.read(CONFIG_FILE)
-    todoist_api_key = config['todoist']['api_key']
-    openai_api_key = config['openai']['api_key']
-    # Get preferred model from config if available, otherwise use default
-    preferred_model = config['openai'].get('preferred_model', "gpt-4o-mini")
-    # Get project-specific model mappings
-    project_models = {}
-    if 'project_models' in config:
-        project_models = dict(config['project_models'])
-except Exception as e:
-    print(f"{Fore.RED}Error reading configuration file: {e}{Style.RESET_ALL}")
-    print(f"Please make sure {CONFIG_FILE} exists with [todoist] and [openai] sections containing api_key fields.")
-    sys.exit(1)
+
+# Words that usually mark a task as needing real thought, or as a quick errand
+DEFAULT_COMPLEX_KEYWORDS = "plan, strategy, design, research, analyze, analyse, architecture, migrate, proposal, roadmap, evaluate, compare, outline, draft, prepare"
+DEFAULT_SIMPLE_KEYWORDS = "buy, call, email, text, pay, book, pick up, drop off, order, renew, cancel, water, clean, remind"
+
+# Comma-separated config values as a list of lowercase entries
+def split_list(value):
+    return [item.strip().lower() for item in value.split(",") if item.strip()]
+
+class Settings:
+    """
+    Values read from a config.ini file. With a profile name, the default local state files
+    (task store, journal, batch state) are named after the profile so accounts run side by
+    side don't share them.
+    """
+
+    def __init__(self, config, profile=None):
+        suffix = f".{profile}" if profile else ""
+        self.todoist_api_key = config['todoist']['api_key']
+        self.openai_api_key = config['openai']['api_key']
+        # Get preferred model from config if available, otherwise use default
+        self.preferred_model = config['openai'].get('preferred_model', "gpt-4o-mini")
+        # Retry and circuit breaker settings for the shared OpenAI client
+        self.openai_max_retries = config['openai'].getint('max_retries', 5)
+        # Optional API base URL, e.g. for a proxy or a local stand-in server
+        self.openai_base_url = config['openai'].get('base_url') or None
+        self.circuit_breaker_threshold = config['openai'].getint('circuit_breaker_threshold', 3)
+        self.circuit_breaker_cooldown = config['openai'].getfloat('circuit_breaker_cooldown', 60.0)
+        # Optional starting tokens-per-minute budget; learned from rate limit headers otherwise
+        self.tokens_per_minute = config['openai'].getint('tokens_per_minute', None)
+        # Incremental sync endpoint and local task store
+        self.todoist_sync_url = config['todoist'].get('sync_url', "https://api.todoist.com/sync/v9/sync")
+        self.task_store_path = config['todoist'].get('store_path', f".todoist_store{suffix}.json")
+        # Client secret of the Todoist app whose webhooks --webhook-port receives
+        self.webhook_secret = config['todoist'].get('webhook_secret') or None
+        # Progress journal that lets an interrupted non-interactive run resume
+        self.journal_path = config['todoist'].get('journal_path', f".todoist_journal{suffix}.jsonl")
+        # Number of task updates sent per Sync API request (the API accepts at most 100)
+        self.write_batch_size = max(1, min(config['todoist'].getint('write_batch_size', 100), 100))
+        # Where the id of a submitted --batch job is kept so a later run can collect its results
+        self.batch_state_path = config['openai'].get('batch_state_path', f".openai_batch{suffix}.json")
+        # Suggestion cache settings
+        self.cache_path = config.get('cache', 'path', fallback=".suggestion_cache.sqlite3")
+        self.cache_ttl_days = config.getfloat('cache', 'ttl_days', fallback=30.0)
+        self.cache_max_entries = config.getint('cache', 'max_entries', fallback=10000)
+        # Reuse suggestions of near-duplicate tasks at or above this similarity; off unless set
+        self.similarity_threshold = config.getfloat('similarity', 'threshold', fallback=0.0)
+        # Complexity-based model routing, off unless [routing] enabled = true
+        self.routing_enabled = config.getboolean('routing', 'enabled', fallback=False)
+        self.routing_simple_model = config.get('routing', 'simple_model', fallback="gpt-4o-mini")
+        self.routing_complex_model = config.get('routing', 'complex_model', fallback="o3-mini")
+        self.routing_complex_keywords = split_list(config.get('routing', 'complex_keywords', fallback=DEFAULT_COMPLEX_KEYWORDS))
+        self.routing_simple_keywords = split_list(config.get('routing', 'simple_keywords', fallback=DEFAULT_SIMPLE_KEYWORDS))
+        self.routing_complex_labels = split_list(config.get('routing', 'complex_labels', fallback=""))
+        self.routing_simple_labels = split_list(config.get('routing', 'simple_labels', fallback=""))
+        self.routing_complex_min_words = config.getint('routing', 'complex_min_words', fallback=12)
+        # Per-run budget; once either is used up every task goes to the simple model
+        self.routing_max_cost = config.getfloat('routing', 'max_cost_usd', fallback=None)
+        self.routing_max_llm_seconds = config.getfloat('routing', 'max_llm_seconds', fallback=None)
+        self.routing_log_path = config.get('routing', 'log_path', fallback=None)
+        # Get project-specific model mappings
+        self.project_models = {}
+        if 'project_models' in config:
+            self.project_models = dict(config['project_models'])
+
+# Read configuration once per file; later calls return the cached Settings
+@functools.lru_cache(maxsize=None)
+def load_config(path=CONFIG_FILE, profile=None):
+    config = configparser.ConfigParser()
+    try:
+        if not config.read(path):
+            raise FileNotFoundError(f"{path} not found")
+        return Settings(config, profile)
+    except Exception as e:
+        print(f"{Fore.RED}Error reading configuration file: {e}{Style.RESET_ALL}")
+        print(f"Please make sure {path} exists with [todoist] and [openai] sections containing api_key fields.")
+        sys.exit(1)
+
+# Set by configure(), which main() calls before doing any work
+settings = None
+circuit_breaker = None
+rate_limiter = None
+model_router = None
+# Set in --profiles worker processes so they all draw from one OpenAI token budget
+shared_rate_budget = None
+
+def configure(path=CONFIG_FILE, profile=None):
+    global settings, circuit_breaker, rate_limiter, model_router
+    settings = load_config(path, profile)
+    circuit_breaker = CircuitBreaker(settings.circuit_breaker_threshold, settings.circuit_breaker_cooldown)
+    rate_limiter = TokenBucket(settings.tokens_per_minute, shared=shared_rate_budget)
+    model_router = ModelRouter(settings) if settings.routing_enabled else None
+    return settings
+
+# Serializes multi-line console output when tasks are processed concurrently
+print_lock = threading.Lock()
+
+# Process-wide OpenAI client, shared by every call so HTTP connections are kept alive and reused
+_openai_client = None
+_openai_client_lock = threading.Lock()
+
+def get_openai_client():
+    """
+    Return the shared OpenAI client, creating it on first use.
+    The client retries 408/409/429/5xx responses with exponential backoff and jitter,
+    honouring any Retry-After header sent by the API.
+    """
+    global _openai_client
+    with _openai_client_lock:
+        if _openai_client is None:
+            from openai import OpenAI
+            _openai_client = OpenAI(api_key=settings.openai_api_key, base_url=settings.openai_base_url, max_retries=settings.openai_max_retries)
+        return _openai_client
+
+class CircuitBreaker:
+    """
+    Track consecutive failures per model. Once a model fails `threshold` times in a row the
+    circuit opens and callers should go straight to the fallback model. After `cooldown`
+    seconds a single trial request is let through; success closes the circuit again.
+    """
+
+    def __init__(self, threshold, cooldown):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._failures = {}
+        self._opened_at = {}
+        self._lock = threading.Lock()
+
+    def is_open(self, model):
+        with self._lock:
+            if self._failures.get(model, 0) < self.threshold:
+                return False
+            if time.monotonic() - self._opened_at[model] >= self.cooldown:
+                # Half-open: let this caller try the model, keep everyone else on the fallback
+                self._opened_at[model] = time.monotonic()
+                return False
+            return True
+
+    def record_success(self, model):
+        with self._lock:
+            self._failures.pop(model, None)
+            self._opened_at.pop(model, None)
+
+    def record_failure(self, model):
+        with self._lock:
+            self._failures[model] = self._failures.get(model, 0) + 1
+            if self._failures[model] >= self.threshold:
+                self._opened_at[model] = time.monotonic()
+
+class RunMetrics:
+    """
+    Timings, token counts and error counters for one run. Recording is a lock and a list
+    append, so the hooks stay on for every call and the numbers are only aggregated when
+    written out with --metrics-out or --metrics-prom.
+    """
+
+    # Estimated USD per 1M (prompt, completion) tokens; reasoning tokens bill as completion tokens
+    PRICES = {
+        "o3-mini": (1.10, 4.40),
+        "o1": (15.00, 60.00),
+        "o1-mini": (1.10, 4.40),
+        "gpt-4o": (2.50, 10.00),
+        "chatgpt-4o-latest": (5.00, 15.00),
+        "gpt-4o-mini": (0.15, 0.60),
+        "gpt-4o-realtime-preview": (5.00, 20.00),
+    }
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.phase_seconds = defaultdict(float)
+        self.llm_latencies = defaultdict(list)
+        self.write_latencies = []
+        self.tokens = {"prompt": 0, "completion": 0, "reasoning": 0}
+        self.cost = 0.0
+        self.counters = defaultdict(int)
+        self.routes = defaultdict(int)
+        self.routing_savings = 0.0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def timer(self, phase):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(phase, time.perf_counter() - start)
+
+    def add_time(self, phase, seconds):
+        with self._lock:
+            self.phase_seconds[phase] += seconds
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] += amount
+
+    def record_llm(self, model, latency, usage, price_factor=1.0):
+        prompt = completion = reasoning = 0
+        if usage is not None:
+            # Batch results carry usage as a plain dict, the SDK as an object
+            if isinstance(usage, dict):
+                prompt = usage.get("prompt_tokens") or 0
+                completion = usage.get("completion_tokens") or 0
+                reasoning = (usage.get("completion_tokens_details") or {}).get("reasoning_tokens") or 0
+            else:
+                prompt = usage.prompt_tokens or 0
+                completion = usage.completion_tokens or 0
+                details = getattr(usage, "completion_tokens_details", None)
+                reasoning = getattr(details, "reasoning_tokens", 0) or 0
+        prompt_price, completion_price = self.PRICES.get(model, (0.0, 0.0))
+        with self._lock:
+            if latency is not None:
+                self.llm_latencies[model].append(latency)
+                self.phase_seconds["llm"] += latency
+            self.tokens["prompt"] += prompt
+            self.tokens["completion"] += completion
+            self.tokens["reasoning"] += reasoning
+            self.cost += (prompt * prompt_price + completion * completion_price) / 1_000_000 * price_factor
+
+    def record_route(self, reason, model, saved_usd):
+        with self._lock:
+            self.routes[(reason, model)] += 1
+            self.routing_savings += saved_usd
+
+    def record_write(self, latency, tasks=1):
+        with self._lock:
+            self.write_latencies.append(latency)
+            self.phase_seconds["todoist_write"] += latency
+            self.counters["tasks_written"] += tasks
+
+    @staticmethod
+    def percentiles(values):
+        if not values:
+            return {"count": 0}
+        ordered = sorted(values)
+        # Nearest-rank percentiles
+        ranked = {f"p{int(q * 100)}": ordered[max(0, math.ceil(q * len(ordered)) - 1)] for q in (0.50, 0.95, 0.99)}
+        return {"count": len(ordered), "sum": sum(ordered), **ranked}
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "started_at": self.started_at,
+                "duration": time.time() - self.started_at,
+                "phase_seconds": dict(self.phase_seconds),
+                "llm_latency": {model: self.percentiles(values) for model, values in self.llm_latencies.items()},
+                "write_latency": self.percentiles(self.write_latencies),
+                "tokens": dict(self.tokens),
+                "estimated_cost_usd": round(self.cost, 6),
+                "fallbacks": self.counters["fallbacks"],
+                "errors": self.counters["errors"],
+                "counters": dict(self.counters),
+                "routing": {
+                    "decisions": [{"reason": reason, "model": model, "tasks": count} for (reason, model), count in self.routes.items()],
+                    "estimated_savings_usd": round(self.routing_savings, 6),
+                },
+            }
+
+    def write_json(self, path):
+        snapshot = self.snapshot()
+        # .jsonl files collect one line per run; anything else gets a single JSON document
+        if path.endswith(".jsonl"):
+            with open(path, "a") as f:
+                f.write(json.dumps(snapshot) + "\n")
+        else:
+            with open(path, "w") as f:
+                json.dump(snapshot, f, indent=2)
+
+    def write_prometheus(self, path):
+        snapshot = self.snapshot()
+        prefix = "todoist_assistant"
+        lines = [f"# TYPE {prefix}_phase_seconds_total counter"]
+        lines += [f'{prefix}_phase_seconds_total{{phase="{phase}"}} {seconds:.6f}' for phase, seconds in snapshot["phase_seconds"].items()]
+        lines.append(f"# TYPE {prefix}_llm_latency_seconds summary")
+        for model, stats in snapshot["llm_latency"].items():
+            for quantile in ("p50", "p95", "p99"):
+                lines.append(f'{prefix}_llm_latency_seconds{{model="{model}",quantile="0.{quantile[1:]}"}} {stats[quantile]:.6f}')
+            lines.append(f'{prefix}_llm_latency_seconds_sum{{model="{model}"}} {stats["sum"]:.6f}')
+            lines.append(f'{prefix}_llm_latency_seconds_count{{model="{model}"}} {stats["count"]}')
+        write_stats = snapshot["write_latency"]
+        if write_stats["count"]:
+            lines.append(f"# TYPE {prefix}_write_latency_seconds summary")
+            for quantile in ("p50", "p95", "p99"):
+                lines.append(f'{prefix}_write_latency_seconds{{quantile="0.{quantile[1:]}"}} {write_stats[quantile]:.6f}')
+            lines.append(f'{prefix}_write_latency_seconds_sum {write_stats["sum"]:.6f}')
+            lines.append(f'{prefix}_write_latency_seconds_count {write_stats["count"]}')
+        lines.append(f"# TYPE {prefix}_tokens_total counter")
+        lines += [f'{prefix}_tokens_total{{kind="{kind}"}} {count}' for kind, count in snapshot["tokens"].items()]
+        lines.append(f"# TYPE {prefix}_estimated_cost_usd gauge")
+        lines.append(f"{prefix}_estimated_cost_usd {snapshot['estimated_cost_usd']}")
+        for name in ("fallbacks", "errors"):
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            lines.append(f"{prefix}_{name}_total {snapshot[name]}")
+        if snapshot["routing"]["decisions"]:
+            lines.append(f"# TYPE {prefix}_routed_tasks_total counter")
+            lines += [f'{prefix}_routed_tasks_total{{reason="{d["reason"]}",model="{d["model"]}"}} {d["tasks"]}' for d in snapshot["routing"]["decisions"]]
+            lines.append(f"# TYPE {prefix}_routing_estimated_savings_usd gauge")
+            lines.append(f"{prefix}_routing_estimated_savings_usd {snapshot['routing']['estimated_savings_usd']}")
+        with open(path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+
+metrics = RunMetrics()
+
+class TokenBucket:
+    """
+    Token-bucket pacing for OpenAI's tokens-per-minute limit. Each request reserves its
+    estimated token cost before it is sent and waits while the bucket is empty. The bucket
+    refills continuously at the per-minute limit, and both the limit and the current level are
+    corrected from the x-ratelimit-*-tokens headers on every response. Until a limit is known
+    from config or headers, requests are not delayed.
+
+    The remaining count in a response already includes that request and everything sent before
+    it, so reconciling only takes off what was reserved after it: acquire() returns a running
+    total of reserved tokens that is handed back to update_from_headers().
+
+    The bucket's state is a flat [capacity, available, reserved_total, updated] sequence, so worker
+    processes can share one budget by passing a multiprocessing Array and Lock as `shared`.
+    """
+
+    def __init__(self, tokens_per_minute=None, shared=None):
+        if shared is None:
+            shared = (self.new_state(tokens_per_minute), threading.Lock())
+        self._state, lock = shared
+        self._condition = threading.Condition(lock)
+
+    @staticmethod
+    def new_state(tokens_per_minute=None):
+        return [float(tokens_per_minute or 0), float(tokens_per_minute or 0), 0.0, time.monotonic()]
+
+    @property
+    def capacity(self):
+        return self._state[0]
+
+    @property
+    def available(self):
+        return self._state[1]
+
+    def _refill(self):
+        now = time.monotonic()
+        capacity = self._state[0]
+        if capacity:
+            self._state[1] = min(capacity, self._state[1] + (now - self._state[3]) * capacity / 60.0)
+        self._state[3] = now
+
+    def acquire(self, tokens):
+        """Wait for room for `tokens`, reserve them and return the reservation mark."""
+        with self._condition:
+            while True:
+                self._refill()
+                capacity = self._state[0]
+                if not capacity:
+                    break
+                # A request bigger than the whole bucket only waits for a full bucket
+                needed = min(tokens, capacity)
+                if self._state[1] >= needed:
+                    self._state[1] -= tokens
+                    break
+                self._condition.wait(timeout=(needed - self._state[1]) * 60.0 / capacity)
+            self._state[2] += tokens
+            return self._state[2]
+
+    def update_from_headers(self, headers, mark=None):
+        limit = headers.get("x-ratelimit-limit-tokens")
+        remaining = headers.get("x-ratelimit-remaining-tokens")
+        with self._condition:
+            self._refill()
+            if limit and limit.isdigit():
+                if not self._state[0]:
+                    # First limit seen: start from a full bucket
+                    self._state[1] = float(limit)
+                self._state[0] = float(limit)
+            if remaining and remaining.isdigit() and self._state[0]:
+                # The server's count is authoritative up to this request; reservations made after
+                # it was sent are not in it yet
+                reserved_since = self._state[2] - mark if mark is not None else 0.0
+                self._state[1] = float(int(remaining)) - reserved_since
+            self._condition.notify_all()
+
+    def drain(self):
+        """Empty the bucket after a 429 so other workers back off too."""
+        with self._condition:
+            if self._state[0]:
+                self._refill()
+                self._state[1] = min(self._state[1], 0.0)
+
+class TaskScheduler:
+    """
+    Heap of tasks waiting for a suggestion, ordered overdue first, then by Todoist priority
+    (4 is the most urgent), then by due date. Tasks without a due date come last within
+    their priority.
+    """
+
+    def __init__(self, tasks=()):
+        self._heap = []
+        self._order = itertools.count()
+        self._today = datetime.date.today()
+        for task in tasks:
+            self.push(task)
+
+    def push(self, task):
+        due_date = datetime.date.fromisoformat(task.due.date[:10]) if task.due else datetime.date.max
+        overdue = due_date < self._today
+        key = (0 if overdue else 1, -(getattr(task, 'priority', 1) or 1), due_date, next(self._order))
+        heapq.heappush(self._heap, (key, task))
+
+    def pop(self):
+        return heapq.heappop(self._heap)[1]
+
+    def drain(self):
+        return [self.pop() for _ in range(len(self._heap))]
+
+    def __len__(self):
+        return len(self._heap)
+
+# Completion tokens assumed when no --tokens limit is set; o-series models also spend reasoning tokens
+DEFAULT_COMPLETION_ESTIMATE = 1000
+DEFAULT_REASONING_COMPLETION_ESTIMATE = 4000
+
+def estimate_request_tokens(params):
+    """Rough token cost of a chat completion request: about 4 characters per prompt token plus the completion budget."""
+    prompt_tokens = sum(len(message.get("content") or "") for message in params["messages"]) // 4 + 10
+    completion_tokens = params.get("max_completion_tokens") or params.get("max_tokens")
+    if completion_tokens is None:
+        completion_tokens = DEFAULT_REASONING_COMPLETION_ESTIMATE if params["model"].startswith('o') else DEFAULT_COMPLETION_ESTIMATE
+    return prompt_tokens + completion_tokens
+
+class SuggestionCache:
+    """
+    On-disk cache of generated suggestions, stored in SQLite.
+    Entries are keyed on the normalized task content and the generation parameters, expire
+    after `ttl_seconds`, and the least recently used entries are evicted beyond `max_entries`.
+    """
+
+    # Evict at most once per this many writes to keep inserts cheap
+    EVICT_EVERY = 100
+
+    def __init__(self, path, ttl_seconds, max_entries):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.latency_saved = 0.0
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS suggestions ("
+            "key TEXT PRIMARY KEY, suggestion TEXT NOT NULL, "
+            "created_at REAL NOT NULL, last_used REAL NOT NULL, latency REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS suggestions_last_used ON suggestions (last_used)")
+        self._evict()
+
+    @staticmethod
+    def make_key(content, model, temperature, reasoning_effort, max_tokens):
+        normalized = " ".join(content.lower().split())
+        raw = json.dumps([normalized, model, temperature, reasoning_effort, max_tokens])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT suggestion, created_at, latency FROM suggestions WHERE key = ?", (key,)
+            ).fetchone()
+            if row and now - row[1] > self.ttl_seconds:
+                self._conn.execute("DELETE FROM suggestions WHERE key = ?", (key,))
+                self._conn.commit()
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE suggestions SET last_used = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            self.latency_saved += row[2]
+            return row[0]
+
+    def put(self, key, suggestion, latency):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO suggestions (key, suggestion, created_at, last_used, latency) VALUES (?, ?, ?, ?, ?)",
+                (key, suggestion, now, now, latency),
+            )
+            self._conn.commit()
+            self._writes += 1
+            if self._writes % self.EVICT_EVERY == 0:
+                self._evict()
+
+    def _evict(self):
+        # Drop expired entries, then the least recently used ones beyond the size limit
+        self._conn.execute("DELETE FROM suggestions WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+        self._conn.execute(
+            "DELETE FROM suggestions WHERE key NOT IN (SELECT key FROM suggestions ORDER BY last_used DESC LIMIT ?)",
+            (self.max_entries,),
+        )
+        self._conn.commit()
+
+    def stats(self):
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM suggestions").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "latency_saved": self.latency_saved,
+            "entries": entries,
+        }
+
+    def close(self):
+        with self._lock:
+            self._evict()
+            self._conn.close()
+
+class SimilarityIndex:
+    """
+    MinHash/LSH index over the text of tasks whose suggestions were written back to Todoist.
+    Signatures are persisted next to the suggestion cache so the index builds incrementally
+    across runs, and lookups only compare against tasks that share an LSH bucket and were
+    answered by the same model. Entries follow the cache's `ttl_seconds` and `max_entries`.
+    """
+
+    NUM_HASHES = 64
+    BANDS = 16
+    ROWS = NUM_HASHES // BANDS
+    _PRIME = (1 << 61) - 1
+    _STOPWORDS = {"a", "an", "and", "the", "to", "for", "of", "on", "in", "my", "with", "at", "by", "up"}
+
+    def __init__(self, path, ttl_seconds, max_entries):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        # Fixed seed so signatures stay comparable between runs
+        rng = random.Random(1729)
+        self._coefficients = [(rng.randrange(1, self._PRIME), rng.randrange(0, self._PRIME)) for _ in range(self.NUM_HASHES)]
+        self._buckets = [{} for _ in range(self.BANDS)]
+        self._entries = []
+        self._known = set()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS accepted_suggestions ("
+            "model TEXT NOT NULL, content TEXT NOT NULL, suggestion TEXT NOT NULL, signature BLOB NOT NULL, "
+            "created_at REAL NOT NULL, last_used REAL NOT NULL, PRIMARY KEY (model, content))"
+        )
+        self._evict()
+        for model, content, suggestion, blob, created_at in self._conn.execute(
+            "SELECT model, content, suggestion, signature, created_at FROM accepted_suggestions"
+        ):
+            signature = array("Q")
+            signature.frombytes(blob)
+            self._insert(model, content, suggestion, signature, created_at)
+
+    def _evict(self):
+        # Same policy as SuggestionCache: drop expired entries, then the least recently used beyond the limit
+        self._conn.execute("DELETE FROM accepted_suggestions WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+        self._conn.execute(
+            "DELETE FROM accepted_suggestions WHERE rowid NOT IN "
+            "(SELECT rowid FROM accepted_suggestions ORDER BY last_used DESC LIMIT ?)",
+            (self.max_entries,),
+        )
+        self._conn.commit()
+
+    @classmethod
+    def normalize(cls, content):
+        words = [word for word in re.findall(r"\w+", content.lower()) if word not in cls._STOPWORDS]
+        return " ".join(words)
+
+    def signature(self, normalized):
+        # Character trigrams tolerate plurals, typos and small rewordings
+        shingles = {normalized[i:i + 3] for i in range(max(len(normalized) - 2, 1))}
+        hashes = [zlib.crc32(shingle.encode("utf-8")) for shingle in shingles]
+        prime = self._PRIME
+        return array("Q", (min((a * h + b) % prime for h in hashes) for a, b in self._coefficients))
+
+    def _band_keys(self, signature):
+        rows = self.ROWS
+        return [tuple(signature[band * rows:(band + 1) * rows]) for band in range(self.BANDS)]
+
+    def _insert(self, model, content, suggestion, signature, created_at):
+        position = len(self._entries)
+        self._entries.append((model, content, suggestion, signature, created_at))
+        self._known.add((model, content))
+        for band, key in enumerate(self._band_keys(signature)):
+            self._buckets[band].setdefault(key, []).append(position)
+
+    def add(self, content, suggestion, model):
+        normalized = self.normalize(content)
+        if not normalized:
+            return
+        with self._lock:
+            if (model, normalized) in self._known:
+                return
+            signature = self.signature(normalized)
+            now = time.time()
+            self._insert(model, normalized, suggestion, signature, now)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO accepted_suggestions (model, content, suggestion, signature, created_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (model, normalized, suggestion, signature.tobytes(), now, now),
+            )
+            self._conn.commit()
+
+    def query(self, content, model):
+        """Return (similarity, content, suggestion) for the closest task answered by `model`, or None."""
+        normalized = self.normalize(content)
+        if not normalized:
+            return None
+        signature = self.signature(normalized)
+        expired_before = time.time() - self.ttl_seconds
+        with self._lock:
+            candidates = set()
+            for band, key in enumerate(self._band_keys(signature)):
+                candidates.update(self._buckets[band].get(key, ()))
+            best = None
+            for position in candidates:
+                other_model, other_content, other_suggestion, other_signature, created_at = self._entries[position]
+                if other_model != model or created_at < expired_before:
+                    continue
+                # The fraction of matching MinHash values estimates the Jaccard similarity
+                similarity = sum(1 for x, y in zip(signature, other_signature) if x == y) / self.NUM_HASHES
+                if best is None or similarity > best[0]:
+                    best = (similarity, other_content, other_suggestion)
+            return best
+
+    def touch(self, content, model):
+        """Mark an entry as used so eviction keeps it."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE accepted_suggestions SET last_used = ? WHERE model = ? AND content = ?",
+                (time.time(), model, content),
+            )
+            self._conn.commit()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def close(self):
+        with self._lock:
+            self._evict()
+            self._conn.close()
+
+# Set up by main() unless --no-cache is given
+suggestion_cache = None
+similarity_index = None
+
+def print_cache_stats():
+    if suggestion_cache is None:
+        print("Suggestion cache is disabled.")
+        return
+    stats = suggestion_cache.stats()
+    print(f"\n{Fore.CYAN}Suggestion cache:{Style.RESET_ALL} {stats['hits']} hits, {stats['misses']} misses "
+          f"(hit rate {stats['hit_rate']:.1%}), ~{stats['latency_saved']:.1f}s of generation time saved, "
+          f"{stats['entries']} entries stored")
+
+class Due:
+    __slots__ = ("date", "string", "is_recurring")
+
+    def __init__(self, date, string, is_recurring=False):
+        self.date = date
+        self.string = string
+        self.is_recurring = is_recurring
+
+class TaskRecord:
+    """Compact local copy of a Todoist task, exposing the attributes the SDK Task does."""
+    __slots__ = ("id", "content", "description", "project_id", "due", "priority", "labels")
+
+    def __init__(self, id, content, description, project_id, due, priority=1, labels=()):
+        self.id = id
+        self.content = content
+        self.description = description
+        self.project_id = project_id
+        self.due = due
+        self.priority = priority
+        self.labels = labels
+
+    @classmethod
+    def from_sync(cls, item):
+        due = item.get("due")
+        if due:
+            # Sync API dates may carry a time component; only the calendar date is used
+            due = Due(due["date"][:10], due.get("string") or "", bool(due.get("is_recurring")))
+        return cls(item["id"], item["content"], item.get("description") or "", item.get("project_id"),
+                   due, item.get("priority", 1), tuple(item.get("labels") or ()))
+
+    def to_row(self):
+        due = (self.due.date, self.due.string, self.due.is_recurring) if self.due else None
+        return [self.id, self.content, self.description, self.project_id, due, self.priority, list(self.labels)]
+
+    @classmethod
+    def from_row(cls, row):
+        task_id, content, description, project_id, due, priority, labels = row
+        return cls(task_id, content, description, project_id, Due(*due) if due else None, priority, tuple(labels))
+
+class ProjectRecord:
+    __slots__ = ("id", "name", "is_inbox_project")
+
+    def __init__(self, id, name, is_inbox_project=False):
+        self.id = id
+        self.name = name
+        self.is_inbox_project = is_inbox_project
+
+class TodoistSyncClient:
+    """Minimal client for the Todoist Sync API, reusing one HTTP session for every request."""
+
+    def __init__(self, api_key, url=None):
+        import requests
+
+        self.url = url or settings.todoist_sync_url
+        self.session = requests.Session()
+        self.session.headers["Authorization"] = f"Bearer {api_key}"
+
+    MAX_ATTEMPTS = 3
+
+    def _post(self, data):
+        for attempt in range(self.MAX_ATTEMPTS):
+            response = self.session.post(self.url, data=data, timeout=60)
+            if response.status_code != 429 or attempt == self.MAX_ATTEMPTS - 1:
+                break
+            # Honour Todoist's rate limit before retrying
+            time.sleep(float(response.headers.get("Retry-After", 5)))
+        response.raise_for_status()
+        return response.json()
+
+    def sync(self, sync_token, resource_types):
+        return self._post({"sync_token": sync_token, "resource_types": json.dumps(resource_types)})
+
+    def commands(self, commands):
+        """Send a batch of sync commands and return the per-command sync_status mapping."""
+        return self._post({"commands": json.dumps(commands)}).get("sync_status", {})
+
+class WriteBackQueue:
+    """
+    Buffer task description updates and send them to Todoist as batched item_update sync
+    commands. Each command's result is mapped back to its task, and only the commands that
+    failed are retried.
+    """
+
+    def __init__(self, client, batch_size=100, max_attempts=3):
+        self.client = client
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self._pending = []
+        self._lock = threading.Lock()
+
+    def add(self, task, description):
+        batch = None
+        with self._lock:
+            self._pending.append((task, description))
+            if len(self._pending) >= self.batch_size:
+                batch, self._pending = self._pending, []
+        if batch:
+            self._send(batch)
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, []
+        for start in range(0, len(pending), self.batch_size):
+            self._send(pending[start:start + self.batch_size])
+
+    @staticmethod
+    def is_transient(error):
+        """Rate limits, server errors and connection problems are retried; anything else is permanent."""
+        if isinstance(error, dict):
+            status = error.get("http_code")
+            return status is not None and (status == 429 or status >= 500)
+        response = getattr(error, "response", None)
+        return response is None or response.status_code == 429 or response.status_code >= 500
+
+    def _send(self, batch):
+        errors = {}
+        for attempt in range(self.max_attempts):
+            if attempt:
+                time.sleep(2 ** attempt)
+            # A fresh uuid per attempt, since Todoist deduplicates commands by uuid
+            commands = {str(uuid.uuid4()): (task, description) for task, description in batch}
+            try:
+                start_time = time.perf_counter()
+                status = self.client.commands([
+                    {"type": "item_update", "uuid": command_id, "args": {"id": task.id, "description": description}}
+                    for command_id, (task, description) in commands.items()
+                ])
+                metrics.record_write(time.perf_counter() - start_time, tasks=sum(1 for result in status.values() if result == "ok"))
+            except Exception as e:
+                errors = {task.id: e for task, _ in batch}
+                if not self.is_transient(e):
+                    break
+                continue
+
+            batch = []
+            errors = {}
+            for command_id, (task, description) in commands.items():
+                result = status.get(command_id)
+                if result == "ok":
+                    record_task_update(task, description)
+                elif result is None:
+                    batch.append((task, description))
+                    errors[task.id] = "no result returned"
+                elif self.is_transient(result):
+                    batch.append((task, description))
+                    errors[task.id] = result.get("error", result)
+                else:
+                    # Retrying would fail the same way, e.g. the task was deleted
+                    self._report(task, result.get("error", result) if isinstance(result, dict) else result)
+            if not batch:
+                return
+
+        for task, _ in batch:
+            self._report(task, errors.get(task.id))
+
+    @staticmethod
+    def _report(task, error):
+        metrics.count("errors")
+        print(f"{Fore.RED}Error updating task '{task.content}': {error}{Style.RESET_ALL}")
+
+# Set up by main() for non-interactive runs; when unset, tasks are updated one REST call at a time
+write_back_queue = None
+
+class CheckpointJournal:
+    """
+    Append-only log of each task's progress through a non-interactive run: queued, generated
+    (with the suggestion text) and written. Every entry is fsync'd before the run moves on, so
+    after a crash or Ctrl-C the next run can write back suggestions that were generated but
+    never saved, and skip tasks that are already done, without paying for them again.
+
+    Replaying keeps the latest state per task and rewrites the file in that compact form. The
+    journal is deleted once a run finishes normally.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.states = {}
+        self._lock = threading.Lock()
+        self._replay()
+        self._fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+
+    def _replay(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn final line from a crash mid-write
+                    continue
+                self.states[entry["id"]] = (entry["state"], entry.get("description"))
+        self._rewrite()
+
+    def _rewrite(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            for task_id, (state, description) in self.states.items():
+                f.write(json.dumps({"id": task_id, "state": state, "description": description}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def record(self, task_id, state, description=None):
+        task_id = str(task_id)
+        line = json.dumps({"id": task_id, "state": state, "description": description}) + "\n"
+        with self._lock:
+            self.states[task_id] = (state, description)
+            os.write(self._fd, line.encode("utf-8"))
+            os.fsync(self._fd)
+
+    def is_done(self, task_id):
+        state = self.states.get(str(task_id), (None, None))[0]
+        return state in ("generated", "written")
+
+    def unwritten(self):
+        """Suggestions that were generated but not yet written back, by task id."""
+        return {task_id: description for task_id, (state, description) in self.states.items() if state == "generated"}
+
+    def queued(self):
+        """Ids of tasks that were picked up but have no suggestion yet."""
+        return [task_id for task_id, (state, _) in self.states.items() if state == "queued"]
+
+    def compact(self):
+        """Forget finished tasks so a long-running watch doesn't grow the journal without bound."""
+        with self._lock:
+            self.states = {task_id: entry for task_id, entry in self.states.items() if entry[0] not in ("written", "dropped")}
+            os.close(self._fd)
+            self._rewrite()
+            self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+
+    def close(self, completed=False):
+        os.close(self._fd)
+        if completed and not self.unwritten():
+            os.remove(self.path)
+
+# Set up by main() for non-interactive runs
+checkpoint_journal = None
+
+# Write back suggestions an interrupted run generated but never saved
+def resume_from_journal(journal, store):
+    pending = journal.unwritten()
+    if not pending:
+        return
+    print(f"{Fore.CYAN}Writing back {len(pending)} suggestions generated by an interrupted run{Style.RESET_ALL}")
+    for task_id, description in pending.items():
+        task = store.tasks.get(task_id)
+        if task is None:
+            # Completed or deleted since
+            journal.record(task_id, "dropped")
+        elif task.description == description:
+            # The write landed before the run died
+            journal.record(task_id, "written")
+        else:
+            write_back_queue.add(task, description)
+    write_back_queue.flush()
+
+class TaskStore:
+    """
+    Local store of active tasks and projects, persisted to disk and kept current through the
+    Todoist Sync API. The first sync downloads the whole account; later syncs send the saved
+    sync token and only receive what changed since. Exposes get_tasks() and get_projects()
+    like TodoistAPI, so the task filters run against it unchanged.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.sync_token = "*"
+        self.tasks = {}
+        self.projects = {}
+        if path and os.path.exists(path):
+            try:
+                with open(path) as f:
+                    data = json.load(f)
+                self.sync_token = data["sync_token"]
+                self.tasks = {row[0]: TaskRecord.from_row(row) for row in data["tasks"]}
+                self.projects = {row[0]: ProjectRecord(*row) for row in data["projects"]}
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                print(f"{Fore.YELLOW}Warning: Ignoring unreadable task store {path}: {e}{Style.RESET_ALL}")
+                self.reset()
+
+    def reset(self):
+        self.sync_token = "*"
+        self.tasks = {}
+        self.projects = {}
+
+    def sync(self, client):
+        """Apply the changes since the last sync and return the ids of added or changed tasks."""
+        data = client.sync(self.sync_token, ["items", "projects"])
+        if data.get("full_sync"):
+            self.tasks = {}
+            self.projects = {}
+
+        changed = set()
+        for item in data.get("items", []):
+            if item.get("is_deleted") or item.get("checked"):
+                self.tasks.pop(item["id"], None)
+            else:
+                self.tasks[item["id"]] = TaskRecord.from_sync(item)
+                changed.add(item["id"])
+        for project in data.get("projects", []):
+            if project.get("is_deleted") or project.get("is_archived"):
+                self.projects.pop(project["id"], None)
+            else:
+                self.projects[project["id"]] = ProjectRecord(project["id"], project.get("name", ""), bool(project.get("inbox_project")))
+
+        if data.get("sync_token") != self.sync_token or data.get("full_sync"):
+            self.sync_token = data["sync_token"]
+            self.save()
+        return changed
+
+    def save(self):
+        if not self.path:
+            return
+        data = {
+            "sync_token": self.sync_token,
+            "tasks": [task.to_row() for task in self.tasks.values()],
+            "projects": [[p.id, p.name, p.is_inbox_project] for p in self.projects.values()],
+        }
+        # Write to a temporary file first so an interrupted save never corrupts the store
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(temp_path, self.path)
+
+    def get_tasks(self):
+        return list(self.tasks.values())
+
+    def get_projects(self):
+        return list(self.projects.values())
+
+class ModelRouter:
+    """
+    Picks a model per task from simple text features: word count, keywords and labels. Quick
+    errands go to the simple model, tasks that look like they need planning go to the project's
+    model or the complex model, and everything else keeps the default. Once the run's cost or
+    LLM time budget is used up, every remaining task goes to the simple model.
+
+    Each task is routed once per run, so prefetches and later lookups agree. Decisions are
+    counted in the run metrics with the estimated saving against the default model, and can
+    also be appended to a JSONL log.
+    """
+
+    def __init__(self, settings):
+        self.settings = settings
+        self._decisions = {}
+        self._lock = threading.Lock()
+
+    def score(self, task):
+        words = re.findall(r"[a-z0-9']+", task.content.lower())
+        text = f" {' '.join(words)} "
+        labels = {label.lower() for label in (getattr(task, 'labels', None) or ())}
+        score = 0
+        if len(words) >= self.settings.routing_complex_min_words:
+            score += 1
+        elif len(words) <= 2:
+            score -= 1
+        if any(f" {keyword} " in text for keyword in self.settings.routing_complex_keywords):
+            score += 2
+        if any(f" {keyword} " in text for keyword in self.settings.routing_simple_keywords):
+            score -= 2
+        if labels.intersection(self.settings.routing_complex_labels):
+            score += 2
+        if labels.intersection(self.settings.routing_simple_labels):
+            score -= 2
+        return score
+
+    def budget_exhausted(self):
+        max_cost, max_seconds = self.settings.routing_max_cost, self.settings.routing_max_llm_seconds
+        return (max_cost is not None and metrics.cost >= max_cost) or \
+            (max_seconds is not None and metrics.phase_seconds["llm"] >= max_seconds)
+
+    @staticmethod
+    def estimated_cost(task, model):
+        prompt_price, completion_price = RunMetrics.PRICES.get(model, (0.0, 0.0))
+        completion = DEFAULT_REASONING_COMPLETION_ESTIMATE if model.startswith('o') else DEFAULT_COMPLETION_ESTIMATE
+        return ((len(task.content) // 4 + 50) * prompt_price + completion * completion_price) / 1_000_000
+
+    def route(self, task, default_model, project_model=None):
+        with self._lock:
+            if task.id in self._decisions:
+                return self._decisions[task.id]
+            score = self.score(task)
+            if self.budget_exhausted():
+                model, reason = self.settings.routing_simple_model, "budget"
+            elif score <= -1:
+                model, reason = self.settings.routing_simple_model, "simple"
+            elif score >= 1:
+                model, reason = project_model or self.settings.routing_complex_model, "complex"
+            else:
+                model, reason = default_model, "default"
+            self._decisions[task.id] = model
+
+        saved = self.estimated_cost(task, default_model) - self.estimated_cost(task, model)
+        metrics.record_route(reason, model, saved)
+        if self.settings.routing_log_path:
+            entry = {"time": time.time(), "task_id": str(task.id), "score": score, "reason": reason,
+                     "default_model": default_model, "model": model, "estimated_savings_usd": round(saved, 6)}
+            with self._lock, open(self.settings.routing_log_path, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+        return model
 
 def get_model_for_project(task, cli_model):
     """
     Determine which model to use based on the task's project and CLI arguments.
-    CLI model takes precedence over project-specific models.
+    CLI model takes precedence over project-specific models, which take precedence over
+    the router's default (but not over its choice for simple tasks) when routing is enabled.
     """
     # Available models for validation
     available_models = [
@@ -48,51 +1105,115 @@ def get_model_for_project(task, cli_model):
     if cli_model:  # CLI argument takes precedence
         return cli_model
         
+    project_model = None
     project_id = str(task.project_id) if hasattr(task, 'project_id') and task.project_id else None
-    if project_id and project_id in project_models:
-        model = project_models[project_id]
+    if project_id and project_id in settings.project_models:
+        model = settings.project_models[project_id]
         if model in available_models:  # Validate the model name
-            return model
+            project_model = model
         else:
             print(f"{Fore.YELLOW}Warning: Invalid model '{model}' specified for project {project_id}. Using default model.{Style.RESET_ALL}")
-    
-    return preferred_model
+
+    if model_router is not None:
+        return model_router.route(task, project_model or settings.preferred_model, project_model)
+    return project_model or settings.preferred_model
+
+class ProjectIndex:
+    """
+    Projects resolved once per run. Identifies the real inbox project by its inbox flag
+    rather than assuming it is the first project returned.
+    """
+
+    def __init__(self, projects):
+        self.projects = {str(project.id): project for project in projects}
+        inbox = next((project for project in projects if getattr(project, 'is_inbox_project', False)), None)
+        if inbox is None and projects:
+            inbox = projects[0]
+        self.inbox_id = str(inbox.id) if inbox else None
+
+    def is_inbox(self, task):
+        project_id = getattr(task, 'project_id', None)
+        return project_id is None or str(project_id) == self.inbox_id
+
+# Select the tasks that need a suggestion in a single pass, parsing each due date once
+def filter_tasks(tasks, project_index, update_all=False, due_today=False, include_inbox=False, include_no_date=False):
+    start_time = time.perf_counter()
+    today = datetime.date.today()
+    no_filters = not due_today and not include_inbox and not include_no_date
+    filtered_tasks = []
+
+    for task in tasks:
+        # Skip tasks that already have suggestions
+        if "SUGGESTION" in task.description.upper():
+            continue
+
+        due_date = datetime.date.fromisoformat(task.due.date[:10]) if task.due else None
+        is_due = due_date is not None and due_date <= today
+
+        if update_all:
+            # Filter based on due date if flag is set
+            if due_today and task.due:
+                if is_due:
+                    filtered_tasks.append(task)
+            # Include tasks without due dates if flag is set
+            elif include_no_date and not task.due:
+                filtered_tasks.append(task)
+            # Include inbox tasks if flag is set
+            elif include_inbox and project_index.is_inbox(task):
+                filtered_tasks.append(task)
+            # Otherwise include all tasks
+            elif no_filters:
+                filtered_tasks.append(task)
+            continue
+
+        # Skip recurring tasks
+        if task.due and "every" in task.due.string.lower():
+            continue
+
+        # Include task based on filters
+        if (
+            # Include due tasks (today or earlier)
+            is_due or
+            # Include inbox tasks if flag is set
+            (include_inbox and project_index.is_inbox(task)) or
+            # Include tasks without due dates if flag is set
+            (include_no_date and not task.due)
+        ):
+            filtered_tasks.append(task)
+
+    metrics.add_time("filter", time.perf_counter() - start_time)
+    return filtered_tasks
 
 # Get the seven most recent tasks that are due today or earlier
-def get_seven_most_recent_tasks(api, offset=0, include_inbox=False, include_no_date=False):
+def get_seven_most_recent_tasks(store, offset=0, include_inbox=False, include_no_date=False, project_index=None):
     try:
-        tasks = api.get_tasks()
+        tasks = store.get_tasks()
+        if project_index is None:
+            project_index = ProjectIndex(store.get_projects())
         
         # Sort tasks by due date if available
         tasks.sort(key=lambda task: task.due.date if task.due else '', reverse=True)
         
-        filtered_tasks = []
-        
-        for task in tasks:
-            # Skip tasks that already have suggestions
-            if "SUGGESTION" in task.description.upper():
-                continue
-                
-            # Skip recurring tasks
-            if task.due and "every" in task.due.string.lower():
-                continue
-                
-            # Include task based on filters
-            if (
-                # Include due tasks (today or earlier)
-                (task.due and datetime.datetime.strptime(task.due.date, '%Y-%m-%d').date() <= datetime.date.today()) or
-                # Include inbox tasks if flag is set
-                (include_inbox and (not hasattr(task, 'project_id') or task.project_id is None or str(task.project_id) == str(api.get_projects()[0].id))) or
-                # Include tasks without due dates if flag is set
-                (include_no_date and not task.due)
-            ):
-                filtered_tasks.append(task)
-        
+        filtered_tasks = filter_tasks(tasks, project_index, include_inbox=include_inbox, include_no_date=include_no_date)
         return filtered_tasks[offset:offset + 7]
     except Exception as e:
         print(f"{Fore.RED}Error retrieving tasks from Todoist: {e}{Style.RESET_ALL}")
         return []
 
+# Bookkeeping once Todoist has confirmed a description update
+def record_task_update(task, description):
+    # Keep the local copy current so later filter passes skip this task
+    task.description = description
+    print(f"{Fore.GREEN}✓ Updated task '{task.content}'{Style.RESET_ALL}")
+    if checkpoint_journal is not None:
+        checkpoint_journal.record(task.id, "written")
+
+    # Remember accepted suggestions so near-duplicate tasks can reuse them
+    if similarity_index is not None and " SUGGESTION:\n" in description:
+        # The header names the model that wrote the suggestion, e.g. "GPT-4O-MINI SUGGESTION:"
+        model = description.split(" SUGGESTION:\n", 1)[0].lower()
+        similarity_index.add(task.content, description, model)
+
 # Update task description with GPT suggestion
 def update_task_description(api, task, suggestion, debug=False, no_update=False):
     try:
@@ -112,19 +1233,26 @@ def update_task_description(api, task, suggestion, debug=False, no_update=False)
             print(f"{Fore.YELLOW}Would update task '{task.content}' with new description (Skipped in demo mode){Style.RESET_ALL}")
             return
             
+        if write_back_queue is not None:
+            # Sent with the next batch of sync commands
+            write_back_queue.add(task, new_description)
+            return
+
         # Update the task in Todoist
+        start_time = time.perf_counter()
         api.update_task(task_id=task_id, description=new_description)
-        print(f"{Fore.GREEN}✓ Updated task '{task.content}'{Style.RESET_ALL}")
+        metrics.record_write(time.perf_counter() - start_time)
+        record_task_update(task, new_description)
         
     except Exception as e:
+        metrics.count("errors")
         print(f"{Fore.RED}Error updating task '{task.content}': {e}{Style.RESET_ALL}")
 
 
-# Generate a suggestion for how to accomplish a task, and select which model to use, as well as the token budget, and temperature
-def generate_suggestions(client, task, model, max_tokens, temperature, debug=False, enable_fallback=False, reasoning_effort="medium", conversation_history=None):
+# Build the chat completion parameters for a task, adapting the prompt and parameters to the model family
+def build_request_params(task, model, max_tokens, temperature, reasoning_effort="medium", conversation_history=None):
     is_o_series_model = model.startswith('o')
-    fallback_model = "gpt-4o-mini"
-    
+
     # Prepare the prompt - Enhanced for reasoning models
     if is_o_series_model:
         system_message = {
@@ -190,35 +1318,135 @@ Always be specific and actionable."""
         model_info = f"{model.upper()} (temp={temperature})"
         if max_tokens is not None:
             model_info += f", max_tokens={max_tokens}"
+
+    return params, model_info
+
+# Print a completion as it streams in, under `header` once the first text arrives; returns (text, usage, chunks)
+def stream_completion(params, header, reservation=None):
+    raw_response = get_openai_client().chat.completions.with_raw_response.create(**params, stream=True, stream_options={"include_usage": True})
+    rate_limiter.update_from_headers(raw_response.headers, reservation)
+    stream = raw_response.parse()
+    parts = []
+    usage = None
+    chunks = 0
+    started = False
+    for chunk in stream:
+        chunks += 1
+        # The final chunk has no choices and carries the usage for the whole response
+        if chunk.usage is not None:
+            usage = chunk.usage
+        if chunk.choices and chunk.choices[0].delta.content:
+            text = chunk.choices[0].delta.content
+            parts.append(text)
+            if not started:
+                if not text.strip():
+                    continue
+                # Only now, so a failed or empty response leaves no dangling header
+                started = True
+                print(f"{Fore.BLUE}{header}{Style.RESET_ALL}")
+                text = text.lstrip()
+            print(f"{Fore.BLUE}{text}{Style.RESET_ALL}", end="", flush=True)
+    if started:
+        print()
+    return "".join(parts).strip(), usage, chunks
+
+def format_usage(usage):
+    summary = f"Tokens used: {usage.prompt_tokens} prompt, {usage.completion_tokens} completion"
+    details = getattr(usage, 'completion_tokens_details', None)
+    if details is not None and getattr(details, 'reasoning_tokens', None):
+        summary += f" ({details.reasoning_tokens} reasoning)"
+    return summary
+
+# Generate a suggestion for how to accomplish a task, and select which model to use, as well as the token budget, and temperature
+def generate_suggestions(client, task, model, max_tokens, temperature, debug=False, enable_fallback=False, reasoning_effort="medium", conversation_history=None, stream=False, quiet=False):
+    is_o_series_model = model.startswith('o')
+    fallback_model = "gpt-4o-mini"
+    # Background prefetches must not write over the interactive prompt
+    log = print if not quiet else (lambda *args, **kwargs: None)
+
+    # Skip a model that keeps failing instead of spending one failed request per task on it
+    if is_o_series_model and enable_fallback and circuit_breaker.is_open(model):
+        log(f"{Fore.YELLOW}{model} has failed repeatedly. Using {fallback_model} instead...{Style.RESET_ALL}")
+        metrics.count("fallbacks")
+        return generate_suggestions(client, task, fallback_model, max_tokens, temperature, debug, enable_fallback, reasoning_effort, conversation_history, stream, quiet)
     
+    params, model_info = build_request_params(task, model, max_tokens, temperature, reasoning_effort, conversation_history)
+
     if debug:
         print(f"\n{Fore.CYAN}Debug - API call parameters:{Style.RESET_ALL}")
         print(json.dumps(params, indent=2))
     
-    print(f"\n{Fore.GREEN}Generating suggestion using {model_info}...{Style.RESET_ALL}")
-    
+    # Follow-up turns depend on the whole conversation, so only first suggestions are cached
+    cache_key = None
+    if suggestion_cache is not None and not conversation_history:
+        cache_key = SuggestionCache.make_key(task.content, model, temperature, reasoning_effort, max_tokens)
+        cached = suggestion_cache.get(cache_key)
+        if cached is not None:
+            metrics.count("cache_hits")
+            log(f"\n{Fore.GREEN}Using cached suggestion for '{task.content}'{Style.RESET_ALL}")
+            return cached
+
+    if similarity_index is not None and settings.similarity_threshold > 0 and not conversation_history:
+        match = similarity_index.query(task.content, model)
+        if match and match[0] >= settings.similarity_threshold:
+            similarity_index.touch(match[1], model)
+            metrics.count("similar_reuses")
+            log(f"\n{Fore.GREEN}Reusing suggestion from similar task '{match[1]}' (similarity {match[0]:.2f}){Style.RESET_ALL}")
+            return match[2]
+
+    log(f"\n{Fore.GREEN}Generating suggestion using {model_info}...{Style.RESET_ALL}")
+
+    # Wait for room in the tokens-per-minute budget instead of running into 429s
+    reservation = rate_limiter.acquire(estimate_request_tokens(params))
     try:
         # Make the API call
-        openai_client = OpenAI(api_key=openai_api_key)
-        response = openai_client.chat.completions.create(**params)
-        
-        # Debug response information
-        if debug:
-            print(f"\n{Fore.CYAN}Debug - Response object:{Style.RESET_ALL}")
-            print(f"Response type: {type(response)}")
-            print(f"Response has content: {hasattr(response, 'choices') and len(response.choices) > 0}")
-            
-            # Show reasoning tokens information if available
-            if hasattr(response, 'usage') and hasattr(response.usage, 'completion_tokens_details'):
-                print(f"Reasoning tokens used: {response.usage.completion_tokens_details.reasoning_tokens}")
+        start_time = time.monotonic()
+        if stream:
+            suggestion, usage, chunks = stream_completion(params, f"{model.upper()} SUGGESTION:", reservation)
+            latency = time.monotonic() - start_time
+            metrics.record_llm(model, latency, usage)
+            if usage is not None:
+                print(f"{Fore.CYAN}{format_usage(usage)}{Style.RESET_ALL}")
+
+            # Debug response information
+            if debug:
+                print(f"\n{Fore.CYAN}Debug - Streamed response:{Style.RESET_ALL}")
+                print(f"Chunks received: {chunks}")
+                print(f"Response has content: {bool(suggestion)}")
+
+                # Show reasoning tokens information if available
+                if usage is not None and getattr(usage, 'completion_tokens_details', None) is not None:
+                    print(f"Reasoning tokens used: {usage.completion_tokens_details.reasoning_tokens}")
+        else:
+            raw_response = get_openai_client().chat.completions.with_raw_response.create(**params)
+            rate_limiter.update_from_headers(raw_response.headers, reservation)
+            response = raw_response.parse()
+            latency = time.monotonic() - start_time
+            metrics.record_llm(model, latency, response.usage)
             
-        # Extract the suggestion text
-        suggestion = response.choices[0].message.content.strip()
+            # Debug response information
+            if debug:
+                print(f"\n{Fore.CYAN}Debug - Response object:{Style.RESET_ALL}")
+                print(f"Response type: {type(response)}")
+                print(f"Response has content: {hasattr(response, 'choices') and len(response.choices) > 0}")
+                
+                # Show reasoning tokens information if available
+                if hasattr(response, 'usage') and hasattr(response.usage, 'completion_tokens_details'):
+                    print(f"Reasoning tokens used: {response.usage.completion_tokens_details.reasoning_tokens}")
+                
+            # Extract the suggestion text
+            suggestion = (response.choices[0].message.content or "").strip()
         
+        if suggestion:
+            circuit_breaker.record_success(model)
+        else:
+            circuit_breaker.record_failure(model)
+
         # Check if suggestion is empty and retry with fallback model if needed
         if not suggestion and is_o_series_model and enable_fallback:
-            print(f"{Fore.YELLOW}Warning: Received empty response from {model}. Falling back to {fallback_model}...{Style.RESET_ALL}")
-            return generate_suggestions(client, task, fallback_model, max_tokens, temperature, debug, enable_fallback, reasoning_effort)
+            log(f"{Fore.YELLOW}Warning: Received empty response from {model}. Falling back to {fallback_model}...{Style.RESET_ALL}")
+            metrics.count("fallbacks")
+            return generate_suggestions(client, task, fallback_model, max_tokens, temperature, debug, enable_fallback, reasoning_effort, conversation_history, stream, quiet)
             
         if debug and suggestion:
             print(f"\n{Fore.CYAN}Debug - Generated suggestion:{Style.RESET_ALL}")
@@ -226,32 +1454,262 @@ Always be specific and actionable."""
             
         if not suggestion:
             return f"Unable to generate suggestion using {model.upper()}"
-            
-        return f"{model.upper()} SUGGESTION:\n{suggestion}"
+
+        suggestion = f"{model.upper()} SUGGESTION:\n{suggestion}"
+        if cache_key is not None:
+            suggestion_cache.put(cache_key, suggestion, latency)
+        return suggestion
     except Exception as e:
-        print(f"{Fore.RED}Error generating suggestion: {str(e)}{Style.RESET_ALL}")
+        log(f"{Fore.RED}Error generating suggestion: {str(e)}{Style.RESET_ALL}")
+        circuit_breaker.record_failure(model)
+        metrics.count("errors")
+        if getattr(e, "status_code", None) == 429:
+            rate_limiter.drain()
         if is_o_series_model and enable_fallback:
-            print(f"{Fore.YELLOW}Falling back to {fallback_model}...{Style.RESET_ALL}")
-            return generate_suggestions(client, task, fallback_model, max_tokens, temperature, debug, enable_fallback, reasoning_effort)
+            log(f"{Fore.YELLOW}Falling back to {fallback_model}...{Style.RESET_ALL}")
+            metrics.count("fallbacks")
+            return generate_suggestions(client, task, fallback_model, max_tokens, temperature, debug, enable_fallback, reasoning_effort, conversation_history, stream, quiet)
         return f"Error: {str(e)}"
 
-def handle_interactive_suggestion(api, task, task_model, token_budget, temperature, debug, enable_fallback, reasoning_effort):
-    conversation_history = [
+# Generate a suggestion for a single task and write it back to Todoist
+def process_task(api, task, model_name, token_budget, temperature, debug, enable_fallback, reasoning_effort, update_all):
+    if checkpoint_journal is not None:
+        checkpoint_journal.record(task.id, "queued")
+    # Get the appropriate model for this task
+    task_model = get_model_for_project(task, model_name)
+    if task_model != (model_name or settings.preferred_model):
+        print(f"\n{Fore.CYAN}Using model {task_model} for this task{Style.RESET_ALL}")
+
+    suggestion = generate_suggestions(api, task, task_model, token_budget, temperature, debug, enable_fallback, reasoning_effort)
+    if checkpoint_journal is not None and "SUGGESTION:\n" in suggestion:
+        # Durable before the write-back is attempted, so a crash cannot lose it
+        checkpoint_journal.record(task.id, "generated", suggestion)
+    with print_lock:
+        print(f"{Fore.GREEN}TASK: {task.content}{Style.RESET_ALL}")
+        print(f"{Fore.BLUE}{suggestion}{Style.RESET_ALL}")
+        print()
+    update_task_description(api, task, suggestion, update_all, no_update=False)
+
+# Process tasks on a bounded pool of worker threads so LLM calls and Todoist write-backs overlap
+def process_tasks_concurrently(api, tasks, concurrency, model_name, token_budget, temperature, debug, enable_fallback, reasoning_effort, update_all):
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    from tqdm import tqdm
+
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    futures = {
+        executor.submit(process_task, api, task, model_name, token_budget, temperature, debug, enable_fallback, reasoning_effort, update_all): task
+        for task in tasks
+    }
+    try:
+        # Advance the progress bar as tasks finish, in whatever order they complete
+        for future in tqdm(as_completed(futures), total=len(futures), desc="Updating tasks", unit="task"):
+            try:
+                future.result()
+            except Exception as e:
+                print(f"{Fore.RED}Error processing task '{futures[future].content}': {e}{Style.RESET_ALL}")
+    except KeyboardInterrupt:
+        print(f"{Fore.YELLOW}Interrupted. Waiting for in-flight tasks to finish...{Style.RESET_ALL}")
+        executor.shutdown(wait=True, cancel_futures=True)
+        raise
+    executor.shutdown(wait=True)
+
+class WebhookReceiver:
+    """
+    Local HTTP endpoint for Todoist webhook events. Requests must carry a valid
+    X-Todoist-Hmac-SHA256 signature made with the app's client secret. Task events call
+    `on_event`; the task data itself is then fetched with the next incremental sync.
+    """
+
+    def __init__(self, port, secret, on_event):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        receiver = self
+        self.secret = secret.encode("utf-8")
+        self.on_event = on_event
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                if not receiver.verify(body, self.headers.get("X-Todoist-Hmac-SHA256", "")):
+                    self.send_response(401)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.end_headers()
+                try:
+                    event = json.loads(body).get("event_name", "")
+                except (ValueError, AttributeError):
+                    return
+                if event.startswith("item:"):
+                    receiver.on_event()
+
+        self._server = ThreadingHTTPServer(("", port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def verify(self, body, signature):
+        expected = base64.b64encode(hmac.new(self.secret, body, hashlib.sha256).digest()).decode("ascii")
+        return hmac.compare_digest(expected, signature)
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+# Keep syncing and pass tasks that were added or changed to `handle` once they have been quiet
+# for `debounce` seconds. A webhook event triggers a sync straight away instead of waiting for
+# the next poll.
+def watch_tasks(store, sync_client, select, handle, interval, debounce, webhook_port=None, backlog=()):
+    wake = threading.Event()
+    receiver = None
+    if webhook_port:
+        if not settings.webhook_secret:
+            print(f"{Fore.RED}Error: --webhook-port needs webhook_secret (your Todoist app's client secret) in the [todoist] section.{Style.RESET_ALL}")
+            sys.exit(1)
+        receiver = WebhookReceiver(webhook_port, settings.webhook_secret, wake.set)
+        print(f"Listening for Todoist webhooks on port {webhook_port}")
+    print(f"{Fore.GREEN}Watching for new tasks (Ctrl-C to stop){Style.RESET_ALL}")
+
+    # Task id -> when it last changed. Each id is journaled as queued when first seen, so a change
+    # still settling at Ctrl-C or a crash is picked up on restart; the backlog has already settled.
+    pending = {}
+    for task_id in backlog:
+        if checkpoint_journal is not None:
+            checkpoint_journal.record(task_id, "queued")
+        pending[task_id] = time.monotonic() - debounce
+    try:
+        while True:
+            try:
+                with metrics.timer("todoist_fetch"):
+                    changed = store.sync(sync_client)
+            except Exception as e:
+                print(f"{Fore.YELLOW}Warning: Could not sync tasks from Todoist: {e}{Style.RESET_ALL}")
+                changed = set()
+            now = time.monotonic()
+            for task_id in changed:
+                if task_id not in pending and checkpoint_journal is not None:
+                    checkpoint_journal.record(task_id, "queued")
+                pending[task_id] = now
+
+            ready = [task_id for task_id, changed_at in pending.items() if now - changed_at >= debounce]
+            for task_id in ready:
+                del pending[task_id]
+            tasks = select([store.tasks[task_id] for task_id in ready if task_id in store.tasks])
+            if tasks:
+                handle(tasks)
+            if ready and checkpoint_journal is not None:
+                # Deleted tasks and ones select() passed over need nothing more
+                selected = {task.id for task in tasks}
+                for task_id in ready:
+                    if task_id not in selected:
+                        checkpoint_journal.record(task_id, "dropped")
+                checkpoint_journal.compact()
+
+            # Come back as soon as the oldest pending change has settled
+            timeout = interval
+            if pending:
+                timeout = min(interval, max(0.0, debounce - (now - min(pending.values()))))
+            wake.wait(timeout)
+            wake.clear()
+    except KeyboardInterrupt:
+        print("\nStopped watching.")
+    finally:
+        if receiver is not None:
+            receiver.close()
+
+# The opening turn of an interactive conversation about a task
+def initial_conversation(task):
+    return [
         {"role": "user", "content": f"Task: {task.content}\n\nPlease provide a suggestion for how to accomplish this task."}
     ]
+
+class SuggestionPrefetcher:
+    """
+    Generate the opening suggestion for upcoming tasks in background threads while the user
+    reviews the current one. Results are keyed by task and model, so a prefetch made for a
+    different model than the one finally used is discarded rather than shown.
+    """
+
+    def __init__(self, depth, token_budget, temperature, debug, enable_fallback, reasoning_effort):
+        from concurrent.futures import ThreadPoolExecutor
+
+        self.depth = depth
+        self._generation_args = (token_budget, temperature, debug, enable_fallback, reasoning_effort)
+        self._executor = ThreadPoolExecutor(max_workers=max(depth, 1))
+        self._futures = {}
+        self._lock = threading.Lock()
+
+    def schedule(self, api, task, model):
+        with self._lock:
+            if self.depth <= 0 or task.id in self._futures:
+                return
+            token_budget, temperature, debug, enable_fallback, reasoning_effort = self._generation_args
+            future = self._executor.submit(
+                generate_suggestions, api, task, model, token_budget, temperature, debug, enable_fallback,
+                reasoning_effort, conversation_history=initial_conversation(task), quiet=True
+            )
+            self._futures[task.id] = (model, future)
+
+    def take(self, task, model):
+        """Return the prefetched suggestion for this task and model, waiting if it is still running."""
+        with self._lock:
+            entry = self._futures.pop(task.id, None)
+        if entry is None:
+            return None
+        prefetched_model, future = entry
+        if prefetched_model != model:
+            future.cancel()
+            return None
+        try:
+            suggestion = future.result()
+        except Exception:
+            return None
+        # Errors are regenerated in the foreground so the user sees what went wrong
+        return suggestion if "SUGGESTION:\n" in suggestion else None
+
+    def retain(self, task_ids):
+        """Drop every prefetch except those for the given tasks."""
+        with self._lock:
+            stale = [task_id for task_id in self._futures if task_id not in task_ids]
+            for task_id in stale:
+                self._futures.pop(task_id)[1].cancel()
+
+    def shutdown(self):
+        self.retain(())
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+def handle_interactive_suggestion(api, task, task_model, token_budget, temperature, debug, enable_fallback, reasoning_effort, stream=True, prefetcher=None):
+    conversation_history = initial_conversation(task)
     
     current_model = task_model
+    # Use the background prefetch, if any, for the first suggestion only
+    prefetched = prefetcher.take(task, current_model) if prefetcher else None
     
     while True:
-        # Generate suggestion with current conversation history and model
-        suggestion = generate_suggestions(
-            api, task, current_model, token_budget, temperature, 
-            debug, enable_fallback, reasoning_effort, 
-            conversation_history=conversation_history
-        )
-        
-        print(f"{Fore.GREEN}TASK: {task.content}{Style.RESET_ALL}")
-        print(f"{Fore.BLUE}{suggestion}{Style.RESET_ALL}")
+        if prefetched is not None:
+            suggestion, prefetched = prefetched, None
+            print(f"{Fore.GREEN}TASK: {task.content}{Style.RESET_ALL}")
+            print(f"{Fore.BLUE}{suggestion}{Style.RESET_ALL}")
+        else:
+            if stream:
+                print(f"{Fore.GREEN}TASK: {task.content}{Style.RESET_ALL}")
+
+            # Generate suggestion with current conversation history and model
+            suggestion = generate_suggestions(
+                api, task, current_model, token_budget, temperature, 
+                debug, enable_fallback, reasoning_effort, 
+                conversation_history=conversation_history,
+                stream=stream
+            )
+            
+            if not stream:
+                print(f"{Fore.GREEN}TASK: {task.content}{Style.RESET_ALL}")
+                print(f"{Fore.BLUE}{suggestion}{Style.RESET_ALL}")
+            elif "SUGGESTION:\n" not in suggestion:
+                # Errors and "Unable to generate" results are returned, not streamed
+                print(f"{Fore.BLUE}{suggestion}{Style.RESET_ALL}")
         print()
         
         # Add the assistant's response to conversation history
@@ -327,97 +1785,402 @@ def handle_interactive_suggestion(api, task, task_model, token_budget, temperatu
         else:
             print("Invalid choice. Please try again.")
 
+# Submit suggestion requests for all tasks as one OpenAI Batch API job
+def submit_batch(api, tasks, model_name, token_budget, temperature, reasoning_effort, update_all):
+    lines = []
+    batch_tasks = {}
+    for task in tasks:
+        task_model = get_model_for_project(task, model_name)
+        # Apply cached suggestions straight away instead of paying for them again
+        if suggestion_cache is not None:
+            cached = suggestion_cache.get(SuggestionCache.make_key(task.content, task_model, temperature, reasoning_effort, token_budget))
+            if cached is not None:
+                update_task_description(api, task, cached, update_all, no_update=False)
+                continue
+        params, _ = build_request_params(task, task_model, token_budget, temperature, reasoning_effort)
+        custom_id = str(task.id)
+        lines.append(json.dumps({"custom_id": custom_id, "method": "POST", "url": "/v1/chat/completions", "body": params}))
+        batch_tasks[custom_id] = {"content": task.content, "model": task_model}
+
+    if not lines:
+        print("All tasks were answered from the cache. Nothing to submit.")
+        return None
+
+    client = get_openai_client()
+    batch_file = client.files.create(file=("batch.jsonl", "\n".join(lines).encode("utf-8")), purpose="batch")
+    batch = client.batches.create(input_file_id=batch_file.id, endpoint="/v1/chat/completions", completion_window="24h")
+
+    # Persist the batch id first so the results can be collected even if this process exits. The
+    # generation settings are kept too, so results are cached under the key they were made with.
+    state = {
+        "batch_id": batch.id,
+        "submitted_at": time.time(),
+        "generation": {"token_budget": token_budget, "temperature": temperature, "reasoning_effort": reasoning_effort},
+        "tasks": batch_tasks,
+    }
+    with open(settings.batch_state_path, "w") as f:
+        json.dump(state, f)
+    print(f"{Fore.GREEN}Submitted batch {batch.id} with {len(lines)} requests{Style.RESET_ALL}")
+    return state
+
+# Wait for a submitted batch to finish and write its suggestions back to Todoist. With wait=False
+# the batch is checked once; returns False if it is still running.
+def collect_batch(api, store, state, debug, enable_fallback, update_all, poll_interval=60, wait=True):
+    from tqdm import tqdm
+
+    # Use the settings the batch was submitted with, not this run's flags
+    generation = state["generation"]
+    token_budget = generation["token_budget"]
+    temperature = generation["temperature"]
+    reasoning_effort = generation["reasoning_effort"]
+
+    client = get_openai_client()
+    terminal_states = ("completed", "failed", "expired", "cancelled")
+    while True:
+        batch = client.batches.retrieve(state["batch_id"])
+        counts = batch.request_counts
+        progress = f" ({counts.completed}/{counts.total} done, {counts.failed} failed)" if counts else ""
+        print(f"Batch {batch.id}: {batch.status}{progress}")
+        if batch.status in terminal_states:
+            break
+        if not wait:
+            print("Run the same command again later to apply the results.")
+            return False
+        time.sleep(poll_interval)
+
+    if batch.status != "completed":
+        print(f"{Fore.RED}Batch {batch.id} ended with status '{batch.status}'.{Style.RESET_ALL}")
+
+    results = {}
+    if batch.output_file_id:
+        for line in client.files.content(batch.output_file_id).text.splitlines():
+            if line.strip():
+                result = json.loads(line)
+                results[result["custom_id"]] = result
+
+    fallback_model = "gpt-4o-mini"
+    for custom_id, info in tqdm(state["tasks"].items(), desc="Applying batch results", unit="task"):
+        task = store.tasks.get(custom_id)
+        if task is None or "SUGGESTION" in task.description.upper():
+            # Completed, deleted or already updated since the batch was submitted
+            continue
+
+        model = info["model"]
+        suggestion = None
+        response = (results.get(custom_id) or {}).get("response") or {}
+        if response.get("status_code") == 200:
+            suggestion = (response["body"]["choices"][0]["message"]["content"] or "").strip()
+            # Batch requests are billed at half the synchronous price
+            metrics.record_llm(model, None, response["body"].get("usage"), price_factor=0.5)
+
+        if suggestion:
+            suggestion = f"{model.upper()} SUGGESTION:\n{suggestion}"
+            if suggestion_cache is not None:
+                suggestion_cache.put(SuggestionCache.make_key(task.content, model, temperature, reasoning_effort, token_budget), suggestion, 0.0)
+        elif model.startswith('o') and enable_fallback:
+            print(f"{Fore.YELLOW}No batch result for '{task.content}' from {model}. Falling back to {fallback_model}...{Style.RESET_ALL}")
+            metrics.count("fallbacks")
+            suggestion = generate_suggestions(api, task, fallback_model, token_budget, temperature, debug, enable_fallback, reasoning_effort)
+        else:
+            print(f"{Fore.RED}No batch result for '{task.content}' from {model}. It will be retried on the next run.{Style.RESET_ALL}")
+            continue
+
+        update_task_description(api, task, suggestion, update_all, no_update=False)
+
+    if os.path.exists(settings.batch_state_path):
+        os.remove(settings.batch_state_path)
+    return True
+
 # Parse command line arguments
-def main(interactive, update_all, due_today, model_name, token_budget, temperature, debug=False, enable_fallback=False, reasoning_effort="medium", include_inbox=False, include_no_date=False):
+def main(interactive, update_all, due_today, model_name, token_budget, temperature, debug=False, enable_fallback=False, reasoning_effort="medium", include_inbox=False, include_no_date=False, concurrency=1, use_cache=True, full_sync=False, batch=False, batch_wait=True, batch_poll_interval=60, stream=True, prefetch_depth=2, similarity_threshold=None, config_file=CONFIG_FILE, profile=None, watch=False, watch_interval=None, watch_debounce=5.0, webhook_port=None):
+    global suggestion_cache, similarity_index, write_back_queue, checkpoint_journal
+    from todoist_api_python.api import TodoistAPI
+    from tqdm import tqdm
+
+    configure(config_file, profile)
+    if similarity_threshold is not None:
+        settings.similarity_threshold = similarity_threshold
+    if use_cache:
+        try:
+            suggestion_cache = SuggestionCache(settings.cache_path, settings.cache_ttl_days * 86400, settings.cache_max_entries)
+            similarity_index = SimilarityIndex(settings.cache_path, settings.cache_ttl_days * 86400, settings.cache_max_entries)
+        except sqlite3.Error as e:
+            print(f"{Fore.YELLOW}Warning: Could not open suggestion cache {settings.cache_path}: {e}. Continuing without cache.{Style.RESET_ALL}")
+
+    store = TaskStore(settings.task_store_path)
+    if full_sync:
+        store.reset()
+    incremental = store.sync_token != "*"
+
     try:
-        api = TodoistAPI(todoist_api_key)
-        # Test the API connection
-        api.get_tasks(limit=1)
+        api = TodoistAPI(settings.todoist_api_key)
+        sync_client = TodoistSyncClient(settings.todoist_api_key)
+        # The first sync doubles as the connection test
+        with metrics.timer("todoist_fetch"):
+            startup_changes = store.sync(sync_client)
         print(f"{Fore.GREEN}Successfully connected to Todoist API{Style.RESET_ALL}")
+        # Resolve projects once for every filter pass in this run
+        project_index = ProjectIndex(store.get_projects())
     except Exception as e:
         print(f"{Fore.RED}Error connecting to Todoist API: {e}{Style.RESET_ALL}")
-        print(f"Please check your API key in {CONFIG_FILE}")
+        print(f"Please check your API key in {config_file}")
         sys.exit(1)
         
-    offset = 0
+    prefetcher = None
+    completed = False
+    if not interactive or update_all:
+        write_back_queue = WriteBackQueue(sync_client, settings.write_batch_size)
+        if not batch:
+            checkpoint_journal = CheckpointJournal(settings.journal_path)
+            resume_from_journal(checkpoint_journal, store)
+    elif prefetch_depth > 0:
+        prefetcher = SuggestionPrefetcher(prefetch_depth, token_budget, temperature, debug, enable_fallback, reasoning_effort)
 
-    while True:
-        if update_all:
+    try:
+        if batch and os.path.exists(settings.batch_state_path):
+            # Finish the batch submitted by an earlier run before starting a new one
+            with open(settings.batch_state_path) as f:
+                state = json.load(f)
+            print(f"Resuming batch {state['batch_id']} submitted by an earlier run")
+            if not collect_batch(api, store, state, debug, enable_fallback, update_all, batch_poll_interval, batch_wait):
+                return
+            # Then submit whatever still needs a suggestion, so every scheduled run submits a batch
+            write_back_queue.flush()
             try:
-                tasks = api.get_tasks()
-                filtered_tasks = []
-                
-                for task in tasks:
-                    # Skip tasks that already have suggestions
-                    if "SUGGESTION" in task.description.upper():
-                        continue
-                        
-                    # Filter based on due date if flag is set
-                    if due_today and task.due:
-                        if datetime.datetime.strptime(task.due.date, '%Y-%m-%d').date() <= datetime.date.today():
-                            filtered_tasks.append(task)
-                    # Include tasks without due dates if flag is set
-                    elif include_no_date and not task.due:
-                        filtered_tasks.append(task)
-                    # Include inbox tasks if flag is set
-                    elif include_inbox and (not hasattr(task, 'project_id') or task.project_id is None or str(task.project_id) == str(api.get_projects()[0].id)):
-                        filtered_tasks.append(task)
-                    # Otherwise include all tasks
-                    elif not due_today and not include_inbox and not include_no_date:
-                        filtered_tasks.append(task)
-                        
-                tasks_to_update = filtered_tasks
+                with metrics.timer("todoist_fetch"):
+                    store.sync(sync_client)
             except Exception as e:
-                print(f"{Fore.RED}Error retrieving tasks: {e}{Style.RESET_ALL}")
-                sys.exit(1)
-        else:
-            tasks_to_update = get_seven_most_recent_tasks(api, offset, include_inbox, include_no_date)
+                print(f"{Fore.YELLOW}Warning: Could not sync tasks from Todoist, using local copy: {e}{Style.RESET_ALL}")
+
+        if watch:
+            # handle() flushes before the next select(), so filter_tasks' SUGGESTION check alone
+            # decides what is done; an edited or cleared task is picked up again
+            def select(tasks):
+                return filter_tasks(tasks, ProjectIndex(store.get_projects()), update_all, due_today, include_inbox, include_no_date)
+
+            def handle(tasks):
+                tasks = TaskScheduler(tasks).drain()
+                if concurrency > 1:
+                    process_tasks_concurrently(api, tasks, concurrency, model_name, token_budget, temperature, debug, enable_fallback, reasoning_effort, update_all)
+                else:
+                    for task in tasks:
+                        process_task(api, task, model_name, token_budget, temperature, debug, enable_fallback, reasoning_effort, update_all)
+                write_back_queue.flush()
+
+            # Tasks still queued when the last watcher stopped, and those that changed while none
+            # was running (unless this is the first sync, when every task counts as changed)
+            backlog = set(checkpoint_journal.queued())
+            if incremental:
+                backlog |= startup_changes
+
+            # With webhooks, polling is only a safety net for missed events
+            if watch_interval is None:
+                watch_interval = 600 if webhook_port else 30
+            watch_tasks(store, sync_client, select, handle, watch_interval, watch_debounce, webhook_port, backlog)
+            # Keep the journal while changes are still queued, so the next watcher picks them up
+            completed = not checkpoint_journal.queued()
+            return
+
+        offset = 0
+        first_pass = True
+
+        while True:
+            if not first_pass:
+                # Only fetch what changed since the previous page
+                try:
+                    with metrics.timer("todoist_fetch"):
+                        store.sync(sync_client)
+                except Exception as e:
+                    print(f"{Fore.YELLOW}Warning: Could not sync tasks from Todoist, using local copy: {e}{Style.RESET_ALL}")
+            first_pass = False
 
-        if not tasks_to_update:
             if update_all:
-                print("No tasks to update. This is probably because you have already updated all tasks with suggestions.")
+                try:
+                    tasks_to_update = filter_tasks(store.get_tasks(), project_index, update_all, due_today, include_inbox, include_no_date)
+                except Exception as e:
+                    print(f"{Fore.RED}Error retrieving tasks: {e}{Style.RESET_ALL}")
+                    sys.exit(1)
             else:
-                print("No tasks found that match your current filters. Try:")
-                print(" - Adding the --inbox flag to include inbox tasks")
-                print(" - Adding the --no-due-date flag to include tasks without due dates")
-                print(" - Adding tasks with due dates set to today or earlier")
-            break
+                tasks_to_update = get_seven_most_recent_tasks(store, offset, include_inbox, include_no_date, project_index)
+
+            if not tasks_to_update:
+                if update_all:
+                    print("No tasks to update. This is probably because you have already updated all tasks with suggestions.")
+                else:
+                    print("No tasks found that match your current filters. Try:")
+                    print(" - Adding the --inbox flag to include inbox tasks")
+                    print(" - Adding the --no-due-date flag to include tasks without due dates")
+                    print(" - Adding tasks with due dates set to today or earlier")
+                completed = True
+                break
+
+            if not interactive or update_all:
+                if checkpoint_journal is not None:
+                    # Done by an earlier run that was interrupted
+                    tasks_to_update = [task for task in tasks_to_update if not checkpoint_journal.is_done(task.id)]
+                # Most urgent first, so a rate-limited or interrupted run still covers what matters
+                tasks_to_update = TaskScheduler(tasks_to_update).drain()
 
-        # Wrap tasks_to_update with tqdm to show progress bar
-        for task in tqdm(tasks_to_update, desc="Updating tasks", unit="task"):
-            # Get the appropriate model for this task
-            task_model = get_model_for_project(task, model_name)
-            if task_model != model_name:
-                print(f"\n{Fore.CYAN}Using model {task_model} for project {task.project_id}{Style.RESET_ALL}")
-            
             if interactive and not update_all:
-                handle_interactive_suggestion(api, task, task_model, token_budget, temperature, debug, enable_fallback, reasoning_effort)
-            else:
-                suggestion = generate_suggestions(api, task, task_model, token_budget, temperature, debug, enable_fallback, reasoning_effort)
-                print(f"{Fore.GREEN}TASK: {task.content}{Style.RESET_ALL}")
-                print(f"{Fore.BLUE}{suggestion}{Style.RESET_ALL}")
-                print()
-                update_task_description(api, task, suggestion, update_all, no_update=False)
+                next_page = None
+                if prefetcher is not None:
+                    # Prefetches made for tasks that are not on this page are no longer useful
+                    prefetcher.retain({task.id for task in tasks_to_update})
 
-        if not interactive or update_all:
-            break
+                # Wrap tasks_to_update with tqdm to show progress bar
+                for index, task in enumerate(tqdm(tasks_to_update, desc="Updating tasks", unit="task")):
+                    # Get the appropriate model for this task
+                    task_model = get_model_for_project(task, model_name)
+                    if task_model != (model_name or settings.preferred_model):
+                        print(f"\n{Fore.CYAN}Using model {task_model} for this task{Style.RESET_ALL}")
 
-        while True:
-            print("\nChoose an option:")
-            print("1. Get advice on the next 7 tasks. (Type 1, n, or next to continue)")
-            print("2. Quit. Type 2, q, or quit to quit.")
+                    if prefetcher is not None:
+                        # Look ahead on this page, then into the next one
+                        upcoming = tasks_to_update[index + 1:index + 1 + prefetch_depth]
+                        if len(upcoming) < prefetch_depth:
+                            if next_page is None:
+                                next_page = get_seven_most_recent_tasks(store, offset + 7, include_inbox, include_no_date, project_index)
+                            upcoming += next_page[:prefetch_depth - len(upcoming)]
+                        for upcoming_task in upcoming:
+                            prefetcher.schedule(api, upcoming_task, get_model_for_project(upcoming_task, model_name))
 
-            choice = input("Enter the number of your choice: ")
+                    handle_interactive_suggestion(api, task, task_model, token_budget, temperature, debug, enable_fallback, reasoning_effort, stream, prefetcher)
+            elif batch:
+                state = submit_batch(api, tasks_to_update, model_name, token_budget, temperature, reasoning_effort, update_all)
+                if state and batch_wait:
+                    collect_batch(api, store, state, debug, enable_fallback, update_all, batch_poll_interval)
+                elif state:
+                    print("Run the same command again later to apply the results.")
+            elif concurrency > 1:
+                process_tasks_concurrently(api, tasks_to_update, concurrency, model_name, token_budget, temperature, debug, enable_fallback, reasoning_effort, update_all)
+            else:
+                # Wrap tasks_to_update with tqdm to show progress bar
+                for task in tqdm(tasks_to_update, desc="Updating tasks", unit="task"):
+                    process_task(api, task, model_name, token_budget, temperature, debug, enable_fallback, reasoning_effort, update_all)
 
-            if choice == "1" or choice.lower() in ["n", "next"]:
-                offset += 7
+            if not interactive or update_all:
+                completed = True
                 break
-            elif choice == "2" or choice.lower() in ["q", "quit"]:
-                print("Goodbye!")
-                exit(0)
-            else:
-                print("Invalid choice. Please try again.")
 
+            while True:
+                print("\nChoose an option:")
+                print("1. Get advice on the next 7 tasks. (Type 1, n, or next to continue)")
+                print("2. Quit. Type 2, q, or quit to quit.")
+
+                choice = input("Enter the number of your choice: ")
+
+                if choice == "1" or choice.lower() in ["n", "next"]:
+                    offset += 7
+                    break
+                elif choice == "2" or choice.lower() in ["q", "quit"]:
+                    print("Goodbye!")
+                    exit(0)
+                else:
+                    print("Invalid choice. Please try again.")
+    finally:
+        if prefetcher is not None:
+            prefetcher.shutdown()
+        # Send any buffered updates, including on Ctrl-C
+        if write_back_queue is not None:
+            write_back_queue.flush()
+        if checkpoint_journal is not None:
+            checkpoint_journal.close(completed)
+
+# Config files named on the command line, with directories expanded to the *.ini files in them
+def find_profiles(paths):
+    config_files = []
+    for path in paths:
+        if os.path.isdir(path):
+            config_files += sorted(glob.glob(os.path.join(path, "*.ini")))
+        else:
+            config_files.append(path)
+    return config_files
+
+def profile_name(config_file):
+    return os.path.splitext(os.path.basename(config_file))[0]
+
+# tokens_per_minute from a config file, or None if it is unset or the file cannot be read
+def read_tokens_per_minute(config_file):
+    config = configparser.ConfigParser()
+    try:
+        config.read(config_file)
+        return config.getint('openai', 'tokens_per_minute', fallback=None)
+    except (configparser.Error, ValueError):
+        return None
+
+def init_profile_worker(rate_state, rate_lock):
+    global shared_rate_budget
+    shared_rate_budget = (rate_state, rate_lock)
+    # Progress bars from several processes would only garble each other
+    os.environ["TQDM_DISABLE"] = "1"
+    init()
+
+# Run one account in a --profiles worker process, with its output going to <config>.log
+def run_profile(config_file, options):
+    profile = profile_name(config_file)
+    log_path = os.path.splitext(config_file)[0] + ".log"
+    with open(log_path, "a") as log, redirect_stdout(log):
+        try:
+            main(config_file=config_file, profile=profile, **options)
+            status = "ok"
+        except SystemExit as e:
+            # main() exits on an unreadable config or a failed Todoist connection; the reason is in the log
+            status = f"failed (exit code {e.code}, see log)"
+        except Exception as e:
+            status = f"error: {e}"
+        finally:
+            if suggestion_cache is not None:
+                suggestion_cache.close()
+            if similarity_index is not None:
+                similarity_index.close()
+    return {"profile": profile, "config": config_file, "status": status, "log": log_path, "metrics": metrics.snapshot()}
+
+# Process several accounts in parallel worker processes that share the suggestion cache and one OpenAI token budget
+def run_profiles(config_files, workers, options):
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    # Seed the shared budget with the lowest configured limit; otherwise it is learned from response headers.
+    # Unreadable configs are left to their worker, which reports them as failed.
+    limits = [limit for limit in map(read_tokens_per_minute, config_files) if limit]
+    # Fresh interpreters rather than forks, so no threads, sockets or SQLite handles are inherited
+    context = multiprocessing.get_context("spawn")
+    rate_state = context.Array('d', TokenBucket.new_state(min(limits) if limits else None), lock=False)
+    rate_lock = context.Lock()
+
+    results = []
+    start_time = time.monotonic()
+    # One account per process, so module-level state never carries over between accounts
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=init_profile_worker,
+                             initargs=(rate_state, rate_lock), max_tasks_per_child=1) as executor:
+        futures = {executor.submit(run_profile, path, options): path for path in config_files}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {"profile": profile_name(futures[future]), "config": futures[future], "status": f"error: {e}", "log": None, "metrics": None}
+            print(f"{Fore.GREEN if result['status'] == 'ok' else Fore.RED}Finished {result['profile']}: {result['status']}{Style.RESET_ALL}")
+            results.append(result)
+    elapsed = time.monotonic() - start_time
+
+    summary = {"elapsed": elapsed, "profiles": sorted(results, key=lambda result: result["profile"])}
+    print_profile_summary(summary)
+    return summary
+
+def print_profile_summary(summary):
+    print(f"\n{Fore.CYAN}{'Profile':<20} {'Tasks':>6} {'Seconds':>8} {'Tasks/s':>8} {'Cost $':>8} {'Errors':>6}  Status{Style.RESET_ALL}")
+    total_tasks = total_cost = total_errors = 0
+    for result in summary["profiles"]:
+        snapshot = result["metrics"] or {"counters": {}, "duration": 0.0, "estimated_cost_usd": 0.0, "errors": 0}
+        tasks = snapshot["counters"].get("tasks_written", 0)
+        duration = snapshot["duration"]
+        total_tasks += tasks
+        total_cost += snapshot["estimated_cost_usd"]
+        total_errors += snapshot["errors"]
+        print(f"{result['profile']:<20} {tasks:>6} {duration:>8.1f} {tasks / duration if duration else 0:>8.2f} "
+              f"{snapshot['estimated_cost_usd']:>8.4f} {snapshot['errors']:>6}  {result['status']}")
+    elapsed = summary["elapsed"]
+    print(f"{'Total':<20} {total_tasks:>6} {elapsed:>8.1f} {total_tasks / elapsed if elapsed else 0:>8.2f} {total_cost:>8.4f} {total_errors:>6}")
 
 # Run the main function
 if __name__ == "__main__":
@@ -440,7 +2203,7 @@ if __name__ == "__main__":
     parser.add_argument("-m", "--model", 
                       help="OpenAI model to use (overrides config file)", 
                       choices=available_models, 
-                      default=preferred_model)
+                      default=None)
     parser.add_argument("-t", "--tokens", 
                       help="Maximum tokens for the OpenAI API request (optional, no limit if not specified)", 
                       type=int, 
@@ -452,6 +2215,25 @@ if __name__ == "__main__":
     parser.add_argument("--debug", help="Enable debug mode", action="store_true")
     parser.add_argument("--fallback", help="Enable fallback to gpt-4o-mini when errors occur with o-series models", action="store_true")
     parser.add_argument("--reasoning", help="Reasoning effort for o-series models (low, medium, high)", choices=["low", "medium", "high"], default="medium")
+    parser.add_argument("--no-stream", help="In interactive mode, wait for the complete suggestion instead of showing it as it is generated", action="store_true")
+    parser.add_argument("--prefetch", help="In interactive mode, generate suggestions for this many upcoming tasks in the background (default: 2, 0 disables)", type=int, default=2)
+    parser.add_argument("--batch", help="Generate suggestions through the OpenAI Batch API (about half the cost, results within 24 hours)", action="store_true")
+    parser.add_argument("--batch-no-wait", help="With --batch, submit the batch and exit; run again later to apply the results", action="store_true")
+    parser.add_argument("--batch-poll-interval", help="Seconds between batch status checks (default: 60)", type=float, default=60)
+    parser.add_argument("--full-sync", help="Discard the local task store and download all tasks again", action="store_true")
+    parser.add_argument("--no-cache", help="Do not read or write the on-disk suggestion cache", action="store_true")
+    parser.add_argument("--cache-stats", help="Print suggestion cache hit rate and time saved at the end of the run", action="store_true")
+    parser.add_argument("--similarity-threshold", help="Reuse the suggestion of a previously updated task whose text is at least this similar (0.0-1.0, default: 0, disabled)", type=float, default=None)
+    parser.add_argument("--metrics-out", help="Write run metrics (timings, latency percentiles, tokens, estimated cost) to this file; .jsonl appends one line per run", default=None)
+    parser.add_argument("--metrics-prom", help="Write run metrics in Prometheus text format to this file", default=None)
+    parser.add_argument("--config", help=f"Configuration file to use (default: {CONFIG_FILE})", default=CONFIG_FILE)
+    parser.add_argument("-c", "--concurrency", help="Number of tasks to process in parallel in non-interactive mode (default: 1)", type=int, default=1)
+    parser.add_argument("--watch", help="Keep running and add suggestions to tasks as they are added or changed", action="store_true")
+    parser.add_argument("--watch-interval", help="With --watch, seconds between checks for changes (default: 30, or 600 with --webhook-port)", type=float, default=None)
+    parser.add_argument("--debounce", help="With --watch, wait until a task has not changed for this many seconds (default: 5)", type=float, default=5.0)
+    parser.add_argument("--webhook-port", help="With --watch, also receive Todoist webhook events on this port", type=int, default=None)
+    parser.add_argument("--profiles", help="Process several accounts in parallel, one config file per account (files or directories of *.ini files)", nargs="+", metavar="PATH", default=None)
+    parser.add_argument("--profile-workers", help="With --profiles, number of accounts processed at once (default: one per CPU)", type=int, default=None)
     
     args = parser.parse_args()
     
@@ -459,5 +2241,63 @@ if __name__ == "__main__":
     if args.temperature < 0.0 or args.temperature > 2.0:
         print(f"{Fore.RED}Error: Temperature must be between 0.0 and 2.0. Using default of 0.7.{Style.RESET_ALL}")
         args.temperature = 0.7
-    
-    main(args.interactive, args.update_all, args.due_today, args.model, args.tokens, args.temperature, args.debug, args.fallback, args.reasoning, args.inbox, args.no_due_date)
+
+    if args.concurrency < 1:
+        print(f"{Fore.RED}Error: Concurrency must be at least 1. Using default of 1.{Style.RESET_ALL}")
+        args.concurrency = 1
+
+    if args.batch and args.interactive and not args.update_all:
+        print(f"{Fore.RED}Error: --batch cannot be combined with interactive mode.{Style.RESET_ALL}")
+        sys.exit(1)
+
+    if args.watch and ((args.interactive and not args.update_all) or args.batch or args.profiles):
+        print(f"{Fore.RED}Error: --watch cannot be combined with interactive mode, --batch or --profiles.{Style.RESET_ALL}")
+        sys.exit(1)
+
+    if args.webhook_port and not args.watch:
+        print(f"{Fore.RED}Error: --webhook-port requires --watch.{Style.RESET_ALL}")
+        sys.exit(1)
+
+    # Initialize colorama
+    init()
+
+    if args.profiles:
+        if args.interactive and not args.update_all:
+            print(f"{Fore.RED}Error: --profiles cannot be combined with interactive mode.{Style.RESET_ALL}")
+            sys.exit(1)
+        if args.metrics_prom or args.cache_stats:
+            print(f"{Fore.RED}Error: --metrics-prom and --cache-stats are not supported with --profiles; use --metrics-out for per-account metrics.{Style.RESET_ALL}")
+            sys.exit(1)
+        config_files = find_profiles(args.profiles)
+        if not config_files:
+            print(f"{Fore.RED}Error: No config files found in {', '.join(args.profiles)}.{Style.RESET_ALL}")
+            sys.exit(1)
+        options = dict(
+            interactive=False, update_all=args.update_all, due_today=args.due_today, model_name=args.model,
+            token_budget=args.tokens, temperature=args.temperature, debug=args.debug, enable_fallback=args.fallback,
+            reasoning_effort=args.reasoning, include_inbox=args.inbox, include_no_date=args.no_due_date,
+            concurrency=args.concurrency, use_cache=not args.no_cache, full_sync=args.full_sync, batch=args.batch,
+            batch_wait=not args.batch_no_wait, batch_poll_interval=args.batch_poll_interval,
+            similarity_threshold=args.similarity_threshold,
+        )
+        workers = max(1, min(args.profile_workers or os.cpu_count() or 1, len(config_files)))
+        summary = run_profiles(config_files, workers, options)
+        if args.metrics_out:
+            with open(args.metrics_out, "a" if args.metrics_out.endswith(".jsonl") else "w") as f:
+                f.write(json.dumps(summary) + "\n")
+        sys.exit(0 if all(result["status"] == "ok" for result in summary["profiles"]) else 1)
+
+    try:
+        main(args.interactive, args.update_all, args.due_today, args.model, args.tokens, args.temperature, args.debug, args.fallback, args.reasoning, args.inbox, args.no_due_date, args.concurrency, not args.no_cache, args.full_sync, args.batch, not args.batch_no_wait, args.batch_poll_interval, not args.no_stream, args.prefetch, args.similarity_threshold, args.config,
+             watch=args.watch, watch_interval=args.watch_interval, watch_debounce=args.debounce, webhook_port=args.webhook_port)
+    finally:
+        if args.metrics_out:
+            metrics.write_json(args.metrics_out)
+        if args.metrics_prom:
+            metrics.write_prometheus(args.metrics_prom)
+        if args.cache_stats:
+            print_cache_stats()
+        if suggestion_cache is not None:
+            suggestion_cache.close()
+        if similarity_index is not None:
+            similarity_index.close()